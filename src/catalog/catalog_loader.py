@@ -1,14 +1,17 @@
 """Load and validate entry catalog."""
 
+import functools
+import os
+from collections import defaultdict
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from dataclasses import dataclass
-from src.common.io_utils import load_yaml
+from src.common.io_utils import file_signature, load_yaml
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class EntryDefinition:
-    """Single entry from catalog."""
+    """Single entry from catalog (immutable once loaded)."""
 
     id: str
     intervention_type: str
@@ -23,38 +26,40 @@ class EntryDefinition:
     expected_direction: str = "decrease"
 
     @classmethod
-    def from_dict(cls, data: Dict[str, Any], defaults: Dict[str, Any]) -> "EntryDefinition":
-        """Create from catalog dict with defaults."""
-        merged = {**defaults, **data}
-        return cls(
-            id=merged["id"],
-            intervention_type=merged["intervention_type"],
-            subcategory=merged["subcategory"],
-            product=merged["product"],
-            outcome=merged["outcome"],
-            claim_text=merged["claim_text"],
-            search_query=merged["search_query"],
-            version=merged.get("version", "v1"),
-            max_studies=merged.get("max_studies", 5),
-            expected_effect_type=merged.get("expected_effect_type", "SMD"),
-            expected_direction=merged.get("expected_direction", "decrease"),
-        )
+    def from_dict(
+        cls, data: Dict[str, Any], defaults: Optional[Dict[str, Any]] = None
+    ) -> "EntryDefinition":
+        """Create from catalog dict with defaults (unknown catalog keys are ignored)."""
+        merged = {**(defaults or {}), **data}
+        return cls(**{k: merged[k] for k in cls.__dataclass_fields__ if k in merged})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain-dict form (round-trips through from_dict; cheap to pickle to workers)."""
+        return {k: getattr(self, k) for k in self.__dataclass_fields__}
 
     def get_output_path(self, base_dir: Path) -> Path:
         """
         Get output directory path following convention:
         outputs/evidence_catalog/{intervention_type}/{subcategory}/{product}/{outcome}/v{version}/
+
+        Entries are immutable, so the path is memoized per base_dir.
         """
-        return (
-            Path(base_dir)
-            / self.intervention_type
-            / self.subcategory
-            / self.product
-            / self.outcome
-            / self.version
+        return _output_path(
+            os.fspath(base_dir),
+            self.intervention_type,
+            self.subcategory,
+            self.product,
+            self.outcome,
+            self.version,
         )
 
 
+@functools.lru_cache(maxsize=1024)
+def _output_path(base_dir: str, *parts: str) -> Path:
+    # One string join + one Path, instead of six Path.__truediv__ calls
+    return Path(os.path.join(base_dir, *parts))
+
+
 class CatalogLoader:
     """Load and manage entry catalog."""
 
@@ -63,21 +68,25 @@ class CatalogLoader:
         self.catalog_data = load_yaml(self.catalog_path)
         self.defaults = self.catalog_data.get("defaults", {})
         self.entries: List[EntryDefinition] = []
+        self._by_id: Dict[str, EntryDefinition] = {}
+        self._by_type: Dict[str, List[EntryDefinition]] = defaultdict(list)
+        self._by_outcome: Dict[str, List[EntryDefinition]] = defaultdict(list)
         self._load_entries()
 
     def _load_entries(self) -> None:
-        """Load entries from catalog."""
+        """Load entries from catalog and build lookup indexes."""
         entries_data = self.catalog_data.get("entries", [])
         for entry_data in entries_data:
             entry = EntryDefinition.from_dict(entry_data, self.defaults)
             self.entries.append(entry)
+            # First definition wins on duplicate IDs (matches previous scan order)
+            self._by_id.setdefault(entry.id, entry)
+            self._by_type[entry.intervention_type].append(entry)
+            self._by_outcome[entry.outcome].append(entry)
 
     def get_entry_by_id(self, entry_id: str) -> EntryDefinition | None:
         """Get entry by ID."""
-        for entry in self.entries:
-            if entry.id == entry_id:
-                return entry
-        return None
+        return self._by_id.get(entry_id)
 
     def get_all_entries(self) -> List[EntryDefinition]:
         """Get all entries."""
@@ -85,14 +94,35 @@ class CatalogLoader:
 
     def get_entries_by_intervention_type(self, intervention_type: str) -> List[EntryDefinition]:
         """Filter entries by intervention type."""
-        return [e for e in self.entries if e.intervention_type == intervention_type]
+        return list(self._by_type.get(intervention_type, ()))
 
     def get_entries_by_outcome(self, outcome: str) -> List[EntryDefinition]:
         """Filter entries by outcome."""
-        return [e for e in self.entries if e.outcome == outcome]
+        return list(self._by_outcome.get(outcome, ()))
 
     def __len__(self) -> int:
         return len(self.entries)
 
     def __iter__(self):
         return iter(self.entries)
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_catalog(path: str, mtime_ns: int, size: int) -> CatalogLoader:
+    # mtime/size are part of the key so an edited catalog is reloaded
+    return CatalogLoader(path)
+
+
+def load_catalog(catalog_path: Path | str) -> CatalogLoader:
+    """
+    Load catalog, reusing the parsed instance while the file is unchanged.
+
+    The returned loader is shared between callers; treat it as read-only.
+
+    Args:
+        catalog_path: Path to entry catalog YAML
+
+    Returns:
+        CatalogLoader for the current file contents
+    """
+    return _cached_catalog(*file_signature(catalog_path))
@@ -2,8 +2,25 @@
 
 import hashlib
 import json
+import mmap
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Files above this size are hashed through a read-only mmap (zero-copy).
+MMAP_THRESHOLD = 1024 * 1024
+# Read size for the chunked fallback (keeps the SHA pipeline saturated).
+READ_CHUNK_SIZE = 1024 * 1024
+# Upper bound on concurrent hashing threads for manifests.
+MAX_HASH_WORKERS = 8
+# Name of the manifest hash cache sidecar (never listed in the manifest). It is
+# local state: keep it outside directories that get published.
+MANIFEST_CACHE_NAME = ".manifest.cache.json"
+# Cached hashes of files modified this close to the cache write are not trusted:
+# a same-size rewrite within one timestamp tick would be invisible to the stat check.
+RACY_WINDOW_NS = 2 * 10**9
 
 
 def sha256_str(text: str) -> str:
@@ -17,31 +34,117 @@ def sha256_bytes(data: bytes) -> str:
 
 
 def sha256_file(path: Path | str) -> str:
-    """Compute SHA256 hash of file."""
-    h = hashlib.sha256()
+    """
+    Compute SHA256 hash of file.
+
+    Large files are hashed via mmap; otherwise the read loop runs in C
+    through hashlib.file_digest (Python 3.11+), with a 1 MiB chunked
+    fallback for older interpreters.
+    """
     with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
+        if os.fstat(f.fileno()).st_size > MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as mv:
+                    return hashlib.sha256(mv).hexdigest()
+
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+        h = hashlib.sha256()
+        for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b""):
             h.update(chunk)
-    return h.hexdigest()
+        return h.hexdigest()
 
 
 def sha256_dict(data: Dict[str, Any]) -> str:
-    """Compute SHA256 hash of dictionary (via canonical JSON)."""
+    """
+    Compute SHA256 hash of dictionary (via canonical JSON).
+
+    The canonical form stays stdlib json (", "/": " separators) so digests
+    are stable.
+    """
     canonical = json.dumps(data, sort_keys=True, ensure_ascii=False)
-    return sha256_str(canonical)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
 
 
-def compute_manifest_hashes(directory: Path) -> Dict[str, Dict[str, Any]]:
+def compute_manifest_hashes(
+    directory: Path, cache_path: Optional[Path | str] = None
+) -> Dict[str, Dict[str, Any]]:
     """
     Compute hashes for all files in directory.
 
+    Files are hashed concurrently (hashlib releases the GIL); results are
+    collected with ``executor.map`` so manifest order matches directory order.
+
+    Args:
+        directory: Directory whose files are hashed (non-recursive)
+        cache_path: Optional JSON sidecar of {name: [mtime_ns, size, sha256]};
+            files whose (mtime_ns, size) are unchanged reuse the cached digest
+            instead of being re-read. The sidecar itself is skipped.
+
     Returns dict: {filename: {sha256: ..., size: ...}}
     """
-    manifest = {}
-    for file_path in Path(directory).iterdir():
-        if file_path.is_file():
-            manifest[file_path.name] = {
-                "sha256": sha256_file(file_path),
-                "size": file_path.stat().st_size,
-            }
-    return manifest
+    started_ns = time.time_ns()
+    skip = os.path.abspath(cache_path) if cache_path is not None else None
+
+    # DirEntry caches is_file()/stat() from the directory read, so this
+    # avoids the extra stat() syscalls of Path.iterdir().
+    with os.scandir(directory) as it:
+        files = [entry for entry in it if entry.is_file() and os.path.abspath(entry.path) != skip]
+
+    cached = _load_manifest_cache(cache_path) if cache_path is not None else {}
+    stats: List[Tuple[str, int, int]] = []
+    digests: Dict[str, str] = {}
+    to_hash = []
+    for entry in files:
+        st = entry.stat()
+        stats.append((entry.name, st.st_mtime_ns, st.st_size))
+        hit = cached.get(entry.name)
+        if hit is not None and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+            digests[entry.name] = hit[2]
+        else:
+            to_hash.append(entry)
+
+    if to_hash:
+        workers = min(MAX_HASH_WORKERS, os.cpu_count() or 1, len(to_hash))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            hashed = executor.map(lambda entry: sha256_file(entry.path), to_hash)
+            digests.update(zip((entry.name for entry in to_hash), hashed))
+
+    if cache_path is not None and (to_hash or len(cached) != len(stats)):
+        _save_manifest_cache(
+            cache_path,
+            started_ns,
+            {name: [mtime_ns, size, digests[name]] for name, mtime_ns, size in stats},
+        )
+
+    return {name: {"sha256": digests[name], "size": size} for name, _, size in stats}
+
+
+def _load_manifest_cache(cache_path: Path | str) -> Dict[str, List[Any]]:
+    """Read trusted entries from a manifest hash cache (missing/corrupt = empty)."""
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            data = json.load(f)
+        written_ns = data["written_ns"]
+        entries = data["files"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+    return {
+        name: entry
+        for name, entry in entries.items()
+        if isinstance(entry, list) and len(entry) == 3 and entry[0] + RACY_WINDOW_NS < written_ns
+    }
+
+
+def _save_manifest_cache(
+    cache_path: Path | str, written_ns: int, entries: Dict[str, List[Any]]
+) -> None:
+    # Written atomically so a concurrent reader never sees a partial file
+    tmp = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"written_ns": written_ns, "files": entries}, f)
+        os.replace(tmp, cache_path)
+    except OSError:
+        pass
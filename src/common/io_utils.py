@@ -1,39 +1,235 @@
 """I/O utilities for reading/writing configs, CSVs, JSON."""
 
+import functools
 import json
+import math
+import os
+import shutil
 import yaml
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
 import pandas as pd
+from src.common.hashing import sha256_file
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow
+    from pyarrow import csv as pacsv
+except ImportError:
+    pyarrow = None
+    pacsv = None
+
+# Prefer the libyaml-backed C loader/dumper; fall back to pure Python.
+try:
+    from yaml import CSafeDumper as _YamlDumper
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper as _YamlDumper
+    from yaml import SafeLoader as _YamlLoader
+
+# Suffix appended to a YAML path for its parsed-JSON sidecar cache.
+YAML_CACHE_SUFFIX = ".cache.json"
+# Free-text evidence.csv columns (see ExtractedEvidence); absent ones are ignored.
+EVIDENCE_TEXT_COLUMNS = (
+    "study_id", "design", "effect_type", "risk_of_bias", "doi", "journal_id",
+    "outcome_measure", "source_location", "extraction_confidence",
+)
 
 
 def load_yaml(path: Path | str) -> Dict[str, Any]:
-    """Load YAML configuration file."""
+    """
+    Load YAML configuration file.
+
+    Parsed results are cached as JSON keyed on the file's (mtime_ns, size):
+    in-process via an LRU cache, and across processes via a sidecar
+    ``<name>.yaml.cache.json`` file. Each call returns a fresh object, so
+    callers may mutate the result freely.
+    """
+    cached = _load_yaml_as_json(*file_signature(path))
+    if cached is None:
+        return _parse_yaml(path)
+    return json.loads(cached)
+
+
+def file_signature(path: Path | str) -> Tuple[str, int, int]:
+    """
+    Return ``(absolute_path, mtime_ns, size)`` for use as a cache key.
+
+    The key changes whenever the file is rewritten, so caches keyed on it
+    never serve stale contents.
+    """
+    st = os.stat(path)
+    return os.path.abspath(path), st.st_mtime_ns, st.st_size
+
+
+def _parse_yaml(path: Path | str) -> Dict[str, Any]:
     with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=_YamlLoader)
+
+
+@functools.lru_cache(maxsize=64)
+def _load_yaml_as_json(path: str, mtime_ns: int, size: int) -> Optional[str]:
+    """
+    Return the parsed YAML at ``path`` serialized as JSON text.
+
+    Returns None when the document does not survive a JSON round-trip
+    (e.g. dates, non-string keys); such files are parsed directly.
+    """
+    sidecar = path + YAML_CACHE_SUFFIX
+    key = [mtime_ns, size]
+
+    try:
+        with open(sidecar, "r", encoding="utf-8") as f:
+            header, _, body = f.read().partition("\n")
+        if json.loads(header) == key:
+            return body
+    except (OSError, ValueError):
+        pass
+
+    data = _parse_yaml(path)
+    try:
+        body = json.dumps(data, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return None
+    if json.loads(body) != data:
+        return None
+
+    # Write atomically so concurrent pipeline processes never see a partial file
+    tmp = f"{sidecar}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps(key) + "\n" + body)
+        os.replace(tmp, sidecar)
+    except OSError:
+        pass
+
+    return body
 
 
 def save_yaml(data: Dict[str, Any], path: Path | str) -> None:
     """Save data as YAML."""
     with open(path, "w", encoding="utf-8") as f:
-        yaml.dump(data, f, default_flow_style=False, sort_keys=False)
+        yaml.dump(
+            data,
+            f,
+            Dumper=_YamlDumper,
+            default_flow_style=False,
+            sort_keys=False,
+        )
+
+
+def loads_json(text: str | bytes) -> Any:
+    """Parse JSON text (orjson when available, else stdlib json)."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+# orjson options shared by the JSON writers. Datetimes and dataclasses are passed
+# through (and so rejected, as by stdlib json) instead of serialized natively
+_ORJSON_OPTIONS = (
+    (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_SERIALIZE_NUMPY
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+    if orjson is not None
+    else 0
+)
+
+
+def _all_finite(data: Any) -> bool:
+    """
+    False if data holds a NaN or infinite float.
+
+    orjson writes those as null where stdlib json writes NaN/Infinity, so
+    such payloads are left to stdlib json to keep the values.
+    """
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return False
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+        elif isinstance(value, (np.ndarray, np.floating)):
+            if value.dtype.kind in "fc" and not np.isfinite(value).all():
+                return False
+    return True
+
+
+def dumps_json_line(data: Any) -> bytes:
+    """
+    Serialize one JSONL record (compact JSON plus a trailing newline) as UTF-8.
+
+    Uses orjson when available (see save_json for how its output differs);
+    values it cannot encode, and non-finite floats, go through stdlib json.
+    """
+    if orjson is not None and _all_finite(data):
+        try:
+            return orjson.dumps(data, option=_ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            pass
+    return (json.dumps(data, ensure_ascii=False) + "\n").encode("utf-8")
 
 
 def load_json(path: Path | str) -> Dict[str, Any] | List[Any]:
     """Load JSON file."""
+    if orjson is not None:
+        return orjson.loads(Path(path).read_bytes())
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
 def save_json(data: Dict[str, Any] | List[Any], path: Path | str, indent: int = 2) -> None:
-    """Save data as JSON."""
+    """
+    Save data as JSON.
+
+    Uses orjson for the common indent=2 / compact cases; other indents,
+    values orjson cannot encode (e.g. datetimes, which raise TypeError as with
+    stdlib json) and payloads with NaN/Infinity go through stdlib json. The
+    orjson output parses to the same data but is not byte-identical: it
+    writes non-ASCII as UTF-8 like ensure_ascii=False, but formats some
+    floats differently (1e16, not 1e+16) and accepts numpy values.
+    """
+    if orjson is not None and indent in (2, None) and _all_finite(data):
+        option = _ORJSON_OPTIONS
+        if indent == 2:
+            option |= orjson.OPT_INDENT_2
+        try:
+            payload = orjson.dumps(data, option=option)
+        except TypeError:
+            pass
+        else:
+            Path(path).write_bytes(payload)
+            return
+
     with open(path, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=indent, ensure_ascii=False)
 
 
 def load_evidence_csv(path: Path | str) -> pd.DataFrame:
-    """Load evidence.csv with strict schema validation."""
-    df = pd.read_csv(path)
+    """
+    Load evidence.csv with strict schema validation.
+
+    Parsed with pyarrow's multithreaded C++ reader when installed, else
+    pandas' C parser. Text columns are pinned to str for pyarrow, which
+    would otherwise turn date-like values (e.g. a source_location of
+    "2020-01-05") into datetime.date where pandas keeps the string.
+    """
+    if pyarrow is not None:
+        df = pd.read_csv(path, engine="pyarrow", dtype=dict.fromkeys(EVIDENCE_TEXT_COLUMNS, str))
+    else:
+        df = pd.read_csv(path)
 
     # Validate required columns
     required_cols = [
@@ -48,9 +244,47 @@ def load_evidence_csv(path: Path | str) -> pd.DataFrame:
     return df
 
 
-def save_evidence_csv(df: pd.DataFrame, path: Path | str) -> None:
-    """Save DataFrame as evidence.csv."""
-    df.to_csv(path, index=False, encoding="utf-8")
+def save_evidence_csv(df: pd.DataFrame, path: Path | str, engine: str = "pandas") -> None:
+    """
+    Save DataFrame as evidence.csv.
+
+    Args:
+        df: Evidence records
+        path: Output path
+        engine: "pandas" (default) or "pyarrow". The pyarrow writer is
+            multithreaded and worth it for bulk exports, but its output is
+            not byte-identical (all strings quoted, 3.0 written as 3), so the
+            default stays pandas to keep manifest hashes stable.
+    """
+    if engine == "pyarrow":
+        if pacsv is None:
+            raise ImportError("pyarrow not installed. Install with: pip install pyarrow")
+        pacsv.write_csv(pyarrow.Table.from_pandas(df, preserve_index=False), str(path))
+    elif engine == "pandas":
+        df.to_csv(path, index=False, encoding="utf-8")
+    else:
+        raise ValueError(f"Unknown CSV engine: {engine}")
+
+
+def save_records_parquet(
+    records: List[Dict[str, Any]], path: Path | str, compression: str = "zstd"
+) -> None:
+    """
+    Save a list of flat records as a Parquet file (one column per key).
+
+    Columns are built straight from the records by pyarrow, so no
+    DataFrame is materialized.
+
+    Args:
+        records: Rows sharing the same keys
+        path: Output path
+        compression: Parquet codec
+    """
+    if pyarrow is None:
+        raise ImportError("pyarrow not installed. Install with: pip install pyarrow")
+    from pyarrow import parquet
+
+    parquet.write_table(pyarrow.Table.from_pylist(records), str(path), compression=compression)
 
 
 def ensure_dir(path: Path | str) -> Path:
@@ -60,6 +294,97 @@ def ensure_dir(path: Path | str) -> Path:
     return p
 
 
+def copy_file(src: Path | str, dst: Path | str) -> None:
+    """
+    Copy file contents and metadata (equivalent to shutil.copy2).
+
+    On Linux the data is moved in-kernel with os.copy_file_range (a reflink
+    on filesystems that support it); elsewhere, or if the kernel refuses,
+    shutil.copyfile (sendfile-based on Linux) is used. Metadata is applied
+    once afterwards.
+    """
+    if hasattr(os, "copy_file_range"):
+        try:
+            _copy_file_range(src, dst)
+        except OSError:
+            shutil.copyfile(src, dst)
+    else:
+        shutil.copyfile(src, dst)
+    shutil.copystat(src, dst)
+
+
+def _copy_file_range(src: Path | str, dst: Path | str) -> None:
+    # Same guard as shutil.copyfile: opening dst for writing would truncate src
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+        remaining = os.fstat(in_fd).st_size
+        # Usually a single syscall; loop because the kernel may copy less
+        while remaining > 0:
+            copied = os.copy_file_range(in_fd, out_fd, remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+
+
+def copy_if_changed(src: Path | str, dst: Path | str) -> bool:
+    """
+    Copy src to dst unless dst already holds the same content (rsync-style quick check).
+
+    dst is considered up to date when its (st_mtime_ns, st_size) match src;
+    copy_file preserves mtime, so this holds after any previous export. If
+    sizes match but mtimes differ, contents are compared by SHA-256 and a
+    match only refreshes dst's metadata.
+
+    Returns:
+        True if data was copied, False if dst was already up to date
+    """
+    src_stat = os.stat(src)
+    try:
+        dst_stat = os.stat(dst)
+    except FileNotFoundError:
+        copy_file(src, dst)
+        return True
+
+    if dst_stat.st_size == src_stat.st_size:
+        if dst_stat.st_mtime_ns == src_stat.st_mtime_ns:
+            return False
+        if sha256_file(src) == sha256_file(dst):
+            shutil.copystat(src, dst)
+            return False
+
+    copy_file(src, dst)
+    return True
+
+
+def default_io_workers() -> int:
+    """Default thread count for I/O-bound fan-out (copies, hashing)."""
+    return min(16, (os.cpu_count() or 1) * 2)
+
+
+def iter_files_named(root: Path | str, filename: str) -> Iterator[str]:
+    """
+    Recursively yield paths of files called ``filename`` under ``root``.
+
+    Iterative os.scandir walk (cheaper than Path.rglob: no Path per entry,
+    cached d_type). Symlinked directories are not followed, as with rglob.
+    """
+    stack = [os.fspath(root)]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name == filename:
+                        yield entry.path
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+
+
 def read_text(path: Path | str) -> str:
     """Read text file."""
     with open(path, "r", encoding="utf-8") as f:
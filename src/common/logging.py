@@ -1,10 +1,20 @@
 """Logging configuration for TERVYX evidence pipeline."""
 
 import logging
+import logging.handlers
 import sys
 from pathlib import Path
 from typing import Optional
 
+DEFAULT_FORMAT = "[%(asctime)s] %(name)s [%(levelname)s] %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Shared by every logger that uses the default format
+_DEFAULT_FORMATTER = logging.Formatter(DEFAULT_FORMAT, datefmt=DATE_FORMAT)
+
+# File records are buffered and flushed every N records, on ERROR, or at exit
+FILE_BUFFER_CAPACITY = 100
+
 
 def setup_logger(
     name: str,
@@ -15,6 +25,9 @@ def setup_logger(
     """
     Set up logger with console and optional file output.
 
+    Calling again with the same arguments returns the logger untouched
+    (no handler rebuild); different arguments reconfigure it.
+
     Args:
         name: Logger name
         level: Logging level (DEBUG, INFO, WARNING, ERROR)
@@ -25,30 +38,46 @@ def setup_logger(
         Configured logger
     """
     logger = logging.getLogger(name)
+
+    config = (level.upper(), str(log_file) if log_file else None, format_string)
+    if getattr(logger, "_tervyx_config", None) == config:
+        return logger
+
     logger.setLevel(getattr(logging, level.upper()))
 
-    # Remove existing handlers
+    # Remove existing handlers (flushing buffered records and closing files)
+    for handler in logger.handlers:
+        target = getattr(handler, "target", None)
+        handler.close()
+        if target is not None:
+            target.close()
     logger.handlers = []
 
-    # Default format
     if format_string is None:
-        format_string = "[%(asctime)s] %(name)s [%(levelname)s] %(message)s"
-
-    formatter = logging.Formatter(format_string, datefmt="%Y-%m-%d %H:%M:%S")
+        formatter = _DEFAULT_FORMATTER
+    else:
+        formatter = logging.Formatter(format_string, datefmt=DATE_FORMAT)
 
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
     logger.addHandler(console_handler)
 
-    # File handler (optional)
+    # File handler (optional): opened lazily on first write, fed in batches
     if log_file:
         log_file = Path(log_file)
         log_file.parent.mkdir(parents=True, exist_ok=True)
-        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+        file_handler = logging.FileHandler(log_file, encoding="utf-8", delay=True)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        logger.addHandler(
+            logging.handlers.MemoryHandler(
+                FILE_BUFFER_CAPACITY,
+                flushLevel=logging.ERROR,
+                target=file_handler,
+            )
+        )
 
+    logger._tervyx_config = config
     return logger
 
 
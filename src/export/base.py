@@ -0,0 +1,54 @@
+"""Shared file-copy plumbing for the A/D repo exporters."""
+
+import threading
+from pathlib import Path
+from typing import Optional
+
+from src.common.io_utils import copy_file, copy_if_changed, default_io_workers
+
+
+class BaseExporter:
+    """
+    Copies C repo outputs into a target repo, counting copied/skipped files.
+
+    _sync_file() is safe to call from the exporters' worker threads.
+    """
+
+    def __init__(
+        self,
+        source_root: Path,
+        target_root: Path,
+        max_workers: Optional[int] = None,
+        skip_unchanged: bool = True,
+    ):
+        """
+        Initialize exporter.
+
+        Args:
+            source_root: C repo outputs/evidence_catalog/
+            target_root: Target repo directory entries are exported into
+            max_workers: Concurrent entry exports (default: min(16, 2 * CPUs))
+            skip_unchanged: Skip files whose target already matches (mtime+size quick check)
+        """
+        self.source_root = Path(source_root)
+        self.target_root = Path(target_root)
+        self.max_workers = max_workers or default_io_workers()
+        self.skip_unchanged = skip_unchanged
+        self.files_copied = 0
+        self.files_skipped = 0
+        self._stats_lock = threading.Lock()
+
+    def _sync_file(self, source_file: str, target_file: str) -> bool:
+        """Copy one file (unless unchanged) and record it in the copy stats."""
+        if self.skip_unchanged:
+            copied = copy_if_changed(source_file, target_file)
+        else:
+            copy_file(source_file, target_file)
+            copied = True
+
+        with self._stats_lock:
+            if copied:
+                self.files_copied += 1
+            else:
+                self.files_skipped += 1
+        return copied
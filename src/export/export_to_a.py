@@ -1,31 +1,27 @@
 """Export evidence to A repo (tervyx) for deterministic build."""
 
-import shutil
-from pathlib import Path
-from typing import Optional
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from src.common.io_utils import iter_files_named
 from src.common.logging import get_logger
+from src.export.base import BaseExporter
 
 logger = get_logger(__name__)
 
+# Optional per-entry files copied alongside evidence.csv in "sync" mode
+METADATA_FILES = ("metadata.json", "extraction_log.json", "manifest.json")
 
-class ExportToA:
+
+class ExportToA(BaseExporter):
     """
     Export evidence.csv to A repo for consumption by deterministic pipeline.
 
     A repo expects:
     entries/{intervention_type}/{subcategory}/{product}/{outcome}/v{version}/evidence.csv
-    """
 
-    def __init__(self, source_root: Path, target_root: Path):
-        """
-        Initialize exporter.
-
-        Args:
-            source_root: C repo outputs/evidence_catalog/
-            target_root: A repo entries/ directory
-        """
-        self.source_root = Path(source_root)
-        self.target_root = Path(target_root)
+    ``target_root`` is the A repo entries/ directory.
+    """
 
     def export_entry(
         self,
@@ -68,16 +64,40 @@ class ExportToA:
             logger.error(f"evidence.csv not found: {evidence_csv}")
             return False
 
-        shutil.copy2(evidence_csv, target_dir / "evidence.csv")
-        logger.info(f"Copied evidence.csv to {target_dir}")
+        return self._copy_entry(str(source_dir), str(target_dir), copy_mode)
+
+    def _copy_entry(self, source_dir: str, target_dir: str, copy_mode: str) -> bool:
+        """
+        Copy an entry whose source_dir is known to contain evidence.csv.
+
+        Optional metadata files are found with a single scandir of the source
+        directory rather than one exists() check per filename.
+        """
+        os.makedirs(target_dir, exist_ok=True)
+
+        names = ["evidence.csv"]
 
         # Copy metadata (optional but recommended)
         if copy_mode == "sync":
-            for filename in ["metadata.json", "extraction_log.json", "manifest.json"]:
-                source_file = source_dir / filename
-                if source_file.exists():
-                    shutil.copy2(source_file, target_dir / filename)
-                    logger.info(f"Copied {filename} to {target_dir}")
+            with os.scandir(source_dir) as it:
+                present = {entry.name for entry in it if entry.is_file()}
+            names.extend(filename for filename in METADATA_FILES if filename in present)
+
+        copied = [
+            name
+            for name in names
+            if self._sync_file(os.path.join(source_dir, name), os.path.join(target_dir, name))
+        ]
+
+        # One line per entry; lazy %-formatting skips the work when INFO is off
+        logger.info(
+            "Copied %d files (%d unchanged) to %s",
+            len(copied),
+            len(names) - len(copied),
+            target_dir,
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Copied to %s: %s", target_dir, ", ".join(copied))
 
         return True
 
@@ -85,32 +105,52 @@ class ExportToA:
         """
         Export all entries found in source_root to target_root.
 
+        The walk feeds the copy directly: each evidence.csv found already
+        proves its entry directory exists, so entries skip export_entry's
+        existence checks and the target path is derived from the relative
+        path string.
+
         Returns:
             Number of entries exported
         """
-        count = 0
+        source_root = os.fspath(self.source_root)
+        target_root = os.fspath(self.target_root)
+        self.files_copied = self.files_skipped = 0
 
         # Walk source directory
-        for evidence_csv in self.source_root.rglob("evidence.csv"):
+        jobs = []
+        for evidence_csv in iter_files_named(source_root, "evidence.csv"):
             # Parse path: .../{intervention_type}/{subcategory}/{product}/{outcome}/{version}/evidence.csv
-            parts = evidence_csv.relative_to(self.source_root).parts
+            rel_dir = os.path.relpath(os.path.dirname(evidence_csv), source_root)
+            parts = rel_dir.split(os.sep)
 
-            if len(parts) < 6:
+            if len(parts) < 5:
                 logger.warning(f"Unexpected path structure: {evidence_csv}")
                 continue
 
-            intervention_type = parts[0]
-            subcategory = parts[1]
-            product = parts[2]
-            outcome = parts[3]
-            version = parts[4]
-
-            success = self.export_entry(
-                intervention_type, subcategory, product, outcome, version, copy_mode
-            )
-
-            if success:
-                count += 1
-
-        logger.info(f"Exported {count} entries to A repo")
+            if len(parts) == 5:
+                jobs.append(
+                    (
+                        self._copy_entry,
+                        (
+                            os.path.dirname(evidence_csv),
+                            os.path.join(target_root, rel_dir),
+                            copy_mode,
+                        ),
+                    )
+                )
+            else:
+                # Deeper nesting: resolve through the first five components as before
+                jobs.append((self.export_entry, (*parts[:5], copy_mode)))
+
+        # Entries are independent, so copies overlap across a thread pool
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            count = sum(executor.map(lambda job: job[0](*job[1]), jobs))
+
+        logger.info(
+            "Exported %d entries to A repo (%d files copied, %d unchanged skipped)",
+            count,
+            self.files_copied,
+            self.files_skipped,
+        )
         return count
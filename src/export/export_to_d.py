@@ -1,30 +1,24 @@
 """Export evidence to D repo (tervyx-entries) data catalog."""
 
-import shutil
-from pathlib import Path
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+from src.common.io_utils import iter_files_named
 from src.common.logging import get_logger
+from src.export.base import BaseExporter
 
 logger = get_logger(__name__)
 
 
-class ExportToD:
+class ExportToD(BaseExporter):
     """
     Export evidence to D repo (pure data catalog).
 
     D repo is the "encyclopedia" - it stores ESV files for archival purposes.
     A repo will read from D and generate final artifacts.
-    """
-
-    def __init__(self, source_root: Path, target_root: Path):
-        """
-        Initialize exporter.
 
-        Args:
-            source_root: C repo outputs/evidence_catalog/
-            target_root: D repo root directory
-        """
-        self.source_root = Path(source_root)
-        self.target_root = Path(target_root)
+    ``target_root`` is the D repo root directory.
+    """
 
     def export_entry(
         self,
@@ -39,6 +33,39 @@ class ExportToD:
 
         D repo structure mirrors C repo output structure.
         """
+        copies = self._plan_entry(intervention_type, subcategory, product, outcome, version)
+        if copies is None:
+            return False
+
+        n_copied = sum(
+            self._sync_file(source_file, target_file) for source_file, target_file in copies
+        )
+
+        target_dir = (
+            self.target_root / intervention_type / subcategory / product / outcome / version
+        )
+        logger.info(
+            "Mirrored %s (%d files copied, %d unchanged) to D repo: %s",
+            version,
+            n_copied,
+            len(copies) - n_copied,
+            target_dir,
+        )
+        return True
+
+    def _plan_entry(
+        self,
+        intervention_type: str,
+        subcategory: str,
+        product: str,
+        outcome: str,
+        version: str,
+    ) -> Optional[List[Tuple[str, str]]]:
+        """
+        Create the entry's target directory and list its (source, target) file pairs.
+
+        Returns None if the source directory does not exist.
+        """
         # Source directory
         source_dir = (
             self.source_root / intervention_type / subcategory / product / outcome / version
@@ -46,7 +73,7 @@ class ExportToD:
 
         if not source_dir.exists():
             logger.error(f"Source directory does not exist: {source_dir}")
-            return False
+            return None
 
         # Target directory (same structure in D)
         target_dir = (
@@ -55,13 +82,23 @@ class ExportToD:
 
         target_dir.mkdir(parents=True, exist_ok=True)
 
-        # Copy all files
-        for source_file in source_dir.iterdir():
-            if source_file.is_file():
-                shutil.copy2(source_file, target_dir / source_file.name)
+        with os.scandir(source_dir) as it:
+            return [
+                (entry.path, os.path.join(target_dir, entry.name))
+                for entry in it
+                if entry.is_file()
+            ]
 
-        logger.info(f"Mirrored {source_dir.name} to D repo: {target_dir}")
-        return True
+    def _batch_copy(self, copies: List[Tuple[str, str]]) -> None:
+        """
+        Copy all (source, target) pairs through one shared work queue.
+
+        Files from every entry are interleaved across the pool, so small
+        entries don't leave workers idle.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for _ in executor.map(lambda pair: self._sync_file(*pair), copies):
+                pass
 
     def export_all(self) -> int:
         """
@@ -71,24 +108,27 @@ class ExportToD:
             Number of entries exported
         """
         count = 0
+        copies: List[Tuple[str, str]] = []
+        self.files_copied = self.files_skipped = 0
 
-        for evidence_csv in self.source_root.rglob("evidence.csv"):
-            parts = evidence_csv.relative_to(self.source_root).parts
+        for evidence_csv in iter_files_named(self.source_root, "evidence.csv"):
+            parts = os.path.relpath(evidence_csv, self.source_root).split(os.sep)
 
             if len(parts) < 6:
                 logger.warning(f"Unexpected path structure: {evidence_csv}")
                 continue
 
-            intervention_type = parts[0]
-            subcategory = parts[1]
-            product = parts[2]
-            outcome = parts[3]
-            version = parts[4]
-
-            success = self.export_entry(intervention_type, subcategory, product, outcome, version)
-
-            if success:
+            entry_copies = self._plan_entry(*parts[:5])
+            if entry_copies is not None:
+                copies.extend(entry_copies)
                 count += 1
 
-        logger.info(f"Mirrored {count} entries to D repo")
+        self._batch_copy(copies)
+
+        logger.info(
+            "Mirrored %d entries to D repo (%d files copied, %d unchanged skipped)",
+            count,
+            self.files_copied,
+            self.files_skipped,
+        )
         return count
@@ -7,7 +7,12 @@ CRITICAL: Temperature=0, extraction ONLY (no judgment/calculation).
 import os
 import json
 import time
-from typing import Dict, Any, Optional
+import random
+import asyncio
+import functools
+import string
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 
@@ -16,12 +21,160 @@ try:
 except ImportError:
     genai = None
 
+from src.common.io_utils import loads_json
 from src.common.logging import get_logger
+from src.search.cache import ResponseCache
+from src.search.rate_limit import TokenBucket
 
 logger = get_logger(__name__)
 
+# Extraction prompt (str.format syntax). Split into literal chunks once at
+# import so each call only joins the five per-study fields.
+_EXTRACTION_PROMPT = """You are a scientific data extraction assistant. Extract structured evidence from the research abstract below.
 
-@dataclass
+CRITICAL RULES:
+1. COPY numbers EXACTLY as stated - NO calculation, conversion, or estimation
+2. If information is not stated, use null
+3. Return ONLY valid JSON (no markdown, no explanation)
+4. Use precise quotes from abstract for narrative fields
+
+Extract ALL of the following fields:
+
+{{
+  "study_id": "{study_id}",
+  "doi": "{doi}",
+
+  "outcome_context": {{
+    "measure_name": "string (e.g., 'PSQI total score', 'Systolic blood pressure')",
+    "measure_type": "validated_scale | objective_biomarker | self_report | clinical_event | physiological_measure | performance_test | other",
+    "units": "string (e.g., 'points', 'mmHg', 'mg/dL')",
+    "scale_range": "string or null (e.g., '0-21')",
+    "direction": "decrease_is_benefit | increase_is_benefit | neutral | unclear",
+    "assessment_method": "string (how it was measured)",
+    "assessment_timing": "string (when measured)"
+  }},
+
+  "effect": {{
+    "effect_type": "SMD | MD | OR | RR | HR | other",
+    "effect_point": number,
+    "ci_low": number,
+    "ci_high": number,
+    "p_value": "string (as stated, e.g., '<0.001', '0.042') or null",
+    "baseline_mean_treatment": number or null,
+    "baseline_mean_control": number or null,
+    "absolute_change": number or null,
+    "percent_change": number or null
+  }},
+
+  "clinical_context": {{
+    "population": "string (target population)",
+    "baseline_severity": "string (baseline characteristics)",
+    "age_range": "string or null",
+    "sex_distribution": "string or null",
+    "intervention_description": "string (exact intervention with dose/duration)",
+    "intervention_duration": "string",
+    "control_description": "string",
+    "setting": "string or null"
+  }},
+
+  "sample_sizes": {{
+    "n_treatment": integer,
+    "n_control": integer,
+    "n_total": integer,
+    "n_analyzed": integer or null
+  }},
+
+  "narrative": {{
+    "author_effect_description": "string (how authors described effect)",
+    "author_conclusion": "string (authors' conclusion)",
+    "clinical_significance_claimed": boolean,
+    "key_quotes": ["string", ...] (1-3 key sentences)
+  }},
+
+  "safety": {{
+    "adverse_events_mentioned": boolean,
+    "adverse_event_summary": "string or null",
+    "safety_conclusion": "string or null"
+  }},
+
+  "quality_flags": {{
+    "extraction_confidence": "high | medium | low",
+    "data_source": "abstract_only",
+    "needs_manual_review": boolean,
+    "review_reason": "string or null"
+  }}
+}}
+
+Abstract:
+---
+{abstract}
+---
+
+Study details:
+- Study ID: {study_id}
+- DOI: {doi}
+- Year: {year}
+- Journal: {journal}
+
+Return ONLY the JSON object. No markdown, no explanation."""
+
+_PROMPT_PARTS = tuple(
+    (literal, field) for literal, field, _, _ in string.Formatter().parse(_EXTRACTION_PROMPT)
+)
+
+# Up-front token estimate for the TPM quota: ~4 characters per prompt token
+# plus a typical response; reconciled with the reported usage afterwards
+CHARS_PER_TOKEN = 4
+EXPECTED_OUTPUT_TOKENS = 512
+# Abstracts longer than this (~1800 input tokens) are cut before prompting
+MAX_ABSTRACT_CHARS = 1800 * CHARS_PER_TOKEN
+TRUNCATION_MARKER = " [...TRUNCATED...]"
+
+# Required extraction structure: top-level sections, then (section, key) pairs.
+# Built once at import; includes every field the run scripts' summaries read
+_REQUIRED_SECTIONS = ("outcome_context", "effect", "clinical_context", "sample_sizes")
+_REQUIRED_FIELDS = (
+    ("outcome_context", "measure_name"),
+    ("effect", "effect_point"),
+    ("effect", "ci_low"),
+    ("effect", "ci_high"),
+    ("clinical_context", "population"),
+    ("sample_sizes", "n_treatment"),
+    ("sample_sizes", "n_control"),
+)
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    """True for HTTP 429 / quota errors (google.api_core ResourceExhausted)."""
+    return (
+        getattr(error, "code", None) == 429
+        or type(error).__name__ == "ResourceExhausted"
+        or "429" in str(error)
+    )
+
+
+def _truncate(text: str, max_chars: Optional[int]) -> str:
+    """Cut text to max_chars (plus a marker); None disables the cap."""
+    if max_chars is None or not text or len(text) <= max_chars:
+        return text
+    return text[:max_chars] + TRUNCATION_MARKER
+
+
+def _strip_code_fence(text: str) -> str:
+    """Remove a surrounding markdown code fence (```json ... ```) in one scan."""
+    text = text.strip()
+    if not text.startswith("```"):
+        return text
+
+    body_start = text.find("\n") + 1
+    body_end = text.rfind("```")
+    if body_start == 0 or body_end < body_start:
+        # Single-line or unterminated fence
+        return text.strip("`").removeprefix("json").strip()
+    return text[body_start:body_end].strip()
+
+
+@dataclass(slots=True)
 class ExtractionResult:
     """Result from Gemini extraction."""
 
@@ -55,6 +208,12 @@ class GeminiExtractor:
         model: str = "gemini-2.5-flash-lite",
         temperature: float = 0.0,
         max_retries: int = 3,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+        refresh_cache: bool = False,
+        max_abstract_chars: Optional[int] = MAX_ABSTRACT_CHARS,
+        fallback_model: Optional[str] = None,
     ):
         """
         Initialize Gemini client.
@@ -64,6 +223,15 @@ class GeminiExtractor:
             model: Model name (default: gemini-2.5-flash-lite)
             temperature: MUST be 0 for reproducibility
             max_retries: Max retry attempts
+            rpm: Requests-per-minute quota to stay under (default: no limit)
+            tpm: Tokens-per-minute quota to stay under (default: no limit)
+            cache_dir: Directory for cached extractions (None = no disk cache);
+                successful results are keyed on (model, temperature, prompt)
+            refresh_cache: Re-extract instead of reading cached results (still writes them)
+            max_abstract_chars: Longer abstracts are truncated to bound input
+                tokens per call (None = send them whole)
+            fallback_model: Model retried when ``model`` fails to produce a
+                valid extraction (e.g. gemini-2.5-flash; None = no fallback)
         """
         if genai is None:
             raise ImportError(
@@ -81,6 +249,14 @@ class GeminiExtractor:
         self.model_name = model
         self.temperature = temperature
         self.max_retries = max_retries
+        self.max_abstract_chars = max_abstract_chars
+        # Shared by every thread using this client (see extract_batch)
+        self._quota = TokenBucket(rpm, tpm) if rpm or tpm else None
+        # At temperature 0 an extraction is a function of its prompt, so reruns
+        # can reuse earlier results; entries never expire
+        self._cache = ResponseCache(
+            "gemini_extraction", cache_dir, expire_after=None, refresh=refresh_cache
+        )
 
         if temperature != 0:
             logger.warning(
@@ -91,16 +267,32 @@ class GeminiExtractor:
         # Configure Gemini
         genai.configure(api_key=self.api_key)
 
-        # Initialize model
+        # Initialize model. Every GenerativeModel sends through the SDK's
+        # process-wide default client (one pooled gRPC channel), so calls and
+        # threads reuse its connection; it is shared, so it is never closed here
+        generation_config = {
+            "temperature": self.temperature,
+            "top_p": 1.0,
+            "top_k": 1,
+            "max_output_tokens": 4096,
+            # Raw JSON output (no markdown fences to strip)
+            "response_mime_type": "application/json",
+        }
         self.model = genai.GenerativeModel(
             model_name=self.model_name,
-            generation_config={
-                "temperature": self.temperature,
-                "top_p": 1.0,
-                "top_k": 1,
-                "max_output_tokens": 4096,
-            }
+            generation_config=generation_config,
         )
+        # (name, model) pairs tried in order by extract_from_abstract
+        self._models = [(self.model_name, self.model)]
+        if fallback_model:
+            self._models.append(
+                (
+                    fallback_model,
+                    genai.GenerativeModel(
+                        model_name=fallback_model, generation_config=generation_config
+                    ),
+                )
+            )
 
         logger.info(
             f"Initialized Gemini client: {self.model_name}, temp={self.temperature}"
@@ -127,44 +319,132 @@ class GeminiExtractor:
         Returns:
             ExtractionResult with extracted data or error
         """
+        truncated = _truncate(abstract, self.max_abstract_chars)
+        if truncated is not abstract:
+            logger.warning(
+                f"{study_id}: abstract truncated from {len(abstract)} "
+                f"to {self.max_abstract_chars} characters"
+            )
+            abstract = truncated
+
         prompt = self._build_extraction_prompt(
             abstract, study_id, doi, year, journal
         )
 
+        # Earlier results from either model are reused before any API call
+        for model_name, _ in self._models:
+            cached = self._cache.get((model_name, self.temperature, prompt))
+            if cached is not None:
+                logger.info("✓ %s (cached, %s)", study_id, model_name)
+                return ExtractionResult(
+                    success=True,
+                    data=cached,
+                    model=model_name,
+                    temperature=self.temperature,
+                    tokens_used=0,
+                )
+
+        estimated_tokens = len(prompt) // CHARS_PER_TOKEN + EXPECTED_OUTPUT_TOKENS
+
+        # Cheap model first; the fallback model only sees abstracts it failed on
+        result = ExtractionResult(
+            success=False,
+            error="No model configured",
+            model=self.model_name,
+            temperature=self.temperature,
+        )
+        for i, (model_name, model) in enumerate(self._models):
+            has_fallback = i + 1 < len(self._models)
+            result = self._generate(
+                model_name, model, prompt, study_id, estimated_tokens, retry_invalid=not has_fallback
+            )
+            if result.success:
+                break
+            if has_fallback:
+                next_model = self._models[i + 1][0]
+                logger.warning(f"{study_id}: {result.error}; retrying with {next_model}")
+        return result
+
+    def estimate_tokens(
+        self,
+        abstract: str,
+        study_id: str,
+        doi: str,
+        year: int,
+        journal: str,
+    ) -> int:
+        """
+        Estimate the tokens one extract_from_abstract call will consume.
+
+        Same estimate the TPM quota reserves: prompt characters / 4 plus a
+        typical response. Cache hits, retries and fallbacks are not predicted.
+
+        Returns:
+            Estimated input + output tokens for a single attempt
+        """
+        abstract = _truncate(abstract, self.max_abstract_chars)
+        prompt = self._build_extraction_prompt(abstract, study_id, doi, year, journal)
+        return len(prompt) // CHARS_PER_TOKEN + EXPECTED_OUTPUT_TOKENS
+
+    def _generate(
+        self,
+        model_name: str,
+        model: Any,
+        prompt: str,
+        study_id: str,
+        estimated_tokens: int,
+        retry_invalid: bool = True,
+    ) -> ExtractionResult:
+        """
+        Call one model (with retries) and validate/cache its extraction.
+
+        Transport errors and 429s are always retried with backoff. Invalid
+        JSON or a failed validation is retried only if ``retry_invalid``: at
+        temperature 0 a repeat mostly reproduces it, so when a fallback model
+        follows, the failure is returned at once for extract_from_abstract to route.
+        """
         for attempt in range(self.max_retries):
             try:
-                logger.info(
-                    f"Extracting {study_id} (attempt {attempt + 1}/{self.max_retries})"
+                logger.debug(
+                    "Extracting %s with %s (attempt %d/%d)",
+                    study_id,
+                    model_name,
+                    attempt + 1,
+                    self.max_retries,
                 )
 
-                response = self.model.generate_content(prompt)
+                if self._quota is not None:
+                    self._quota.acquire(estimated_tokens)
+
+                response = model.generate_content(prompt)
+
+                # Safely extract token count (usage_metadata can be None)
+                tokens_used = None
+                if hasattr(response, 'usage_metadata') and response.usage_metadata is not None:
+                    tokens_used = getattr(response.usage_metadata, 'total_token_count', None)
+                if self._quota is not None:
+                    self._quota.reconcile(estimated_tokens, tokens_used)
 
                 # Parse JSON from response
                 try:
-                    # Extract JSON from markdown code blocks if present
-                    text = response.text.strip()
-                    if text.startswith("```json"):
-                        text = text.split("```json")[1].split("```")[0].strip()
-                    elif text.startswith("```"):
-                        text = text.split("```")[1].split("```")[0].strip()
-
-                    data = json.loads(text)
+                    data = loads_json(_strip_code_fence(response.text))
 
                     # Validate required fields
-                    if not self._validate_extraction(data):
-                        raise ValueError("Extraction failed validation")
-
-                    logger.info(f"✓ Successfully extracted {study_id}")
+                    is_valid, reason = self._validate_extraction(data)
+                    if not is_valid:
+                        logger.error(f"{study_id}: {reason}")
+                        error = f"Extraction failed validation: {reason}"
+                        if not retry_invalid:
+                            return ExtractionResult(success=False, error=error, model=model_name)
+                        raise ValueError(error)
 
-                    # Safely extract token count (usage_metadata can be None)
-                    tokens_used = None
-                    if hasattr(response, 'usage_metadata') and response.usage_metadata is not None:
-                        tokens_used = getattr(response.usage_metadata, 'total_token_count', None)
+                    logger.info("✓ Successfully extracted %s", study_id)
+                    self._cache.set((model_name, self.temperature, prompt), data)
 
                     return ExtractionResult(
                         success=True,
                         data=data,
-                        model=self.model_name,
+                        model=model_name,
                         temperature=self.temperature,
                         tokens_used=tokens_used,
                     )
@@ -173,10 +453,11 @@ class GeminiExtractor:
                     logger.error(f"JSON parse error for {study_id}: {e}")
                     logger.error(f"Response text: {response.text[:500]}")
 
-                    if attempt == self.max_retries - 1:
+                    if not retry_invalid or attempt == self.max_retries - 1:
                         return ExtractionResult(
                             success=False,
                             error=f"JSON parse error: {e}",
+                            model=model_name,
                         )
 
                     time.sleep(2 ** attempt)  # Exponential backoff
@@ -189,138 +470,121 @@ class GeminiExtractor:
                     return ExtractionResult(
                         success=False,
                         error=str(e),
+                        model=model_name,
                     )
 
-                time.sleep(2 ** attempt)
+                delay = 2 ** attempt
+                if _is_rate_limited(e):
+                    # Jitter so concurrent workers don't retry in lockstep
+                    delay += random.uniform(0, delay)
+                time.sleep(delay)
 
         return ExtractionResult(
             success=False,
             error="Max retries exceeded",
+            model=model_name,
         )
 
-    def _build_extraction_prompt(
+    async def extract_batch(
         self,
-        abstract: str,
-        study_id: str,
-        doi: str,
-        year: int,
-        journal: str,
-    ) -> str:
-        """Build extraction prompt for Gemini."""
-
-        return f"""You are a scientific data extraction assistant. Extract structured evidence from the research abstract below.
-
-CRITICAL RULES:
-1. COPY numbers EXACTLY as stated - NO calculation, conversion, or estimation
-2. If information is not stated, use null
-3. Return ONLY valid JSON (no markdown, no explanation)
-4. Use precise quotes from abstract for narrative fields
-
-Extract ALL of the following fields:
-
-{{
-  "study_id": "{study_id}",
-  "doi": "{doi}",
-
-  "outcome_context": {{
-    "measure_name": "string (e.g., 'PSQI total score', 'Systolic blood pressure')",
-    "measure_type": "validated_scale | objective_biomarker | self_report | clinical_event | physiological_measure | performance_test | other",
-    "units": "string (e.g., 'points', 'mmHg', 'mg/dL')",
-    "scale_range": "string or null (e.g., '0-21')",
-    "direction": "decrease_is_benefit | increase_is_benefit | neutral | unclear",
-    "assessment_method": "string (how it was measured)",
-    "assessment_timing": "string (when measured)"
-  }},
-
-  "effect": {{
-    "effect_type": "SMD | MD | OR | RR | HR | other",
-    "effect_point": number,
-    "ci_low": number,
-    "ci_high": number,
-    "p_value": "string (as stated, e.g., '<0.001', '0.042') or null",
-    "baseline_mean_treatment": number or null,
-    "baseline_mean_control": number or null,
-    "absolute_change": number or null,
-    "percent_change": number or null
-  }},
-
-  "clinical_context": {{
-    "population": "string (target population)",
-    "baseline_severity": "string (baseline characteristics)",
-    "age_range": "string or null",
-    "sex_distribution": "string or null",
-    "intervention_description": "string (exact intervention with dose/duration)",
-    "intervention_duration": "string",
-    "control_description": "string",
-    "setting": "string or null"
-  }},
+        items: Sequence[Dict[str, Any]],
+        concurrency: int = 8,
+    ) -> List[ExtractionResult]:
+        """
+        Extract many abstracts concurrently.
 
-  "sample_sizes": {{
-    "n_treatment": integer,
-    "n_control": integer,
-    "n_total": integer,
-    "n_analyzed": integer or null
-  }},
+        Each blocking extract_from_abstract call runs in a worker thread; at
+        most ``concurrency`` requests are in flight. The calls get their own
+        thread pool, so the loop's default executor (sized by CPU count)
+        does not cap them. The underlying GenerativeModel is shared across
+        workers.
 
-  "narrative": {{
-    "author_effect_description": "string (how authors described effect)",
-    "author_conclusion": "string (authors' conclusion)",
-    "clinical_significance_claimed": boolean,
-    "key_quotes": ["string", ...] (1-3 key sentences)
-  }},
-
-  "safety": {{
-    "adverse_events_mentioned": boolean,
-    "adverse_event_summary": "string or null",
-    "safety_conclusion": "string or null"
-  }},
+        Args:
+            items: Keyword arguments for extract_from_abstract
+                (abstract, study_id, doi, year, journal), one dict per study
+            concurrency: Max simultaneous API calls
 
-  "quality_flags": {{
-    "extraction_confidence": "high | medium | low",
-    "data_source": "abstract_only",
-    "needs_manual_review": boolean,
-    "review_reason": "string or null"
-  }}
-}}
+        Returns:
+            ExtractionResult list in the same order as ``items``
+        """
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            calls = [
+                loop.run_in_executor(
+                    executor, functools.partial(self.extract_from_abstract, **item)
+                )
+                for item in items
+            ]
+            return list(await asyncio.gather(*calls))
 
-Abstract:
----
-{abstract}
----
+    def extract_stream(
+        self,
+        items: Iterable[Dict[str, Any]],
+        concurrency: int = 8,
+    ) -> Iterator[ExtractionResult]:
+        """
+        Extract many abstracts concurrently, yielding results as they finish.
 
-Study details:
-- Study ID: {study_id}
-- DOI: {doi}
-- Year: {year}
-- Journal: {journal}
+        Same worker model as extract_batch, but each result is yielded (in
+        ``items`` order) as soon as it and all earlier ones are done, so
+        callers can persist it immediately. Closing the generator early
+        cancels requests that have not started.
 
-Return ONLY the JSON object. No markdown, no explanation."""
+        Args:
+            items: Keyword arguments for extract_from_abstract, one dict per study
+            concurrency: Max simultaneous API calls
 
-    def _validate_extraction(self, data: Dict[str, Any]) -> bool:
-        """Validate extracted data has required fields."""
+        Yields:
+            ExtractionResult, one per item
+        """
+        executor = ThreadPoolExecutor(max_workers=max(1, concurrency))
+        try:
+            futures = [executor.submit(self.extract_from_abstract, **item) for item in items]
+            for future in futures:
+                yield future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
 
-        required_top_level = ["outcome_context", "effect", "clinical_context", "sample_sizes"]
+    def _build_extraction_prompt(
+        self,
+        abstract: str,
+        study_id: str,
+        doi: str,
+        year: int,
+        journal: str,
+    ) -> str:
+        """Build extraction prompt for Gemini."""
+        values = {
+            "abstract": abstract,
+            "study_id": study_id,
+            "doi": doi,
+            "year": year,
+            "journal": journal,
+        }
+        return "".join(
+            [
+                literal + (format(values[field]) if field is not None else "")
+                for literal, field in _PROMPT_PARTS
+            ]
+        )
 
-        for field in required_top_level:
-            if field not in data:
-                logger.error(f"Missing required field: {field}")
-                return False
+    def _validate_extraction(self, data: Dict[str, Any]) -> Tuple[bool, str]:
+        """
+        Validate extracted data has required fields.
 
-        # Validate outcome_context
-        if "measure_name" not in data["outcome_context"]:
-            logger.error("Missing outcome_context.measure_name")
-            return False
+        Returns:
+            (is_valid, reason) - reason is empty when valid; callers log it
+        """
+        if not isinstance(data, dict):
+            return False, "Extraction is not a JSON object"
 
-        # Validate effect
-        effect_required = ["effect_point", "ci_low", "ci_high"]
-        for field in effect_required:
-            if field not in data["effect"]:
-                logger.error(f"Missing effect.{field}")
-                return False
+        for section in _REQUIRED_SECTIONS:
+            if section not in data:
+                return False, f"Missing required field: {section}"
 
-        # Validate sample sizes
-        if "n_treatment" not in data["sample_sizes"] or "n_control" not in data["sample_sizes"]:
-            logger.error("Missing sample sizes")
-            return False
+        for section, key in _REQUIRED_FIELDS:
+            sub = data[section]
+            if not isinstance(sub, dict) or key not in sub:
+                return False, f"Missing {section}.{key}"
 
-        return True
+        return True, ""
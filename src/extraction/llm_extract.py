@@ -1,13 +1,13 @@
 """LLM extraction (placeholder - requires API keys)."""
 
-from typing import Dict, Any, Optional
-from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
+from dataclasses import dataclass, fields
 from src.common.logging import get_logger
 
 logger = get_logger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class ExtractedEvidence:
     """Extracted evidence from a single study."""
 
@@ -27,6 +27,19 @@ class ExtractedEvidence:
     source_location: Optional[str] = None
     extraction_confidence: str = "medium"
 
+    @classmethod
+    def from_dataframe(cls, df) -> List["ExtractedEvidence"]:
+        """
+        Build one record per DataFrame row (columns matching field names).
+
+        Uses itertuples(name=None), which yields plain tuples without
+        materializing a Series per row.
+        """
+        columns = [f.name for f in fields(cls) if f.name in df.columns]
+        return [
+            cls(**dict(zip(columns, row))) for row in df[columns].itertuples(index=False, name=None)
+        ]
+
 
 class LLMExtractor:
     """
@@ -2,13 +2,51 @@
 
 from typing import Dict, Any, List, Tuple
 from src.common.logging import get_logger
+from src.extraction.llm_extract import ExtractedEvidence
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
 
 logger = get_logger(__name__)
 
+# Temporary column carrying row positions through polars filters
+_ROW_INDEX = "__row_index__"
+
+
+def _is_member(value: Any, allowed: frozenset) -> bool:
+    """Set membership that treats unhashable values (e.g. lists) as not allowed."""
+    try:
+        return value in allowed
+    except TypeError:
+        return False
+
 
 class EvidenceValidator:
     """Validate extracted evidence for integrity and consistency."""
 
+    REQUIRED_FIELDS = (
+        "study_id",
+        "year",
+        "design",
+        "effect_type",
+        "effect_point",
+        "ci_low",
+        "ci_high",
+        "n_treat",
+        "n_ctrl",
+        "risk_of_bias",
+        "doi",
+        "journal_id",
+    )
+    VALID_EFFECT_TYPES = frozenset(("SMD", "MD", "OR", "RR", "HR"))
+    VALID_RISK_OF_BIAS = frozenset(("low", "moderate", "high", "unclear"))
+    YEAR_RANGE = (1990, 2025)
+
+    # Set form of REQUIRED_FIELDS for C-level presence checks; the tuple keeps message order
+    _REQUIRED = frozenset(REQUIRED_FIELDS)
+
     @staticmethod
     def validate_record(record: Dict[str, Any]) -> Tuple[bool, List[str]]:
         """
@@ -19,41 +57,106 @@ class EvidenceValidator:
         """
         errors = []
 
+        # Required fields (one set check; messages are only built on failure)
+        if not EvidenceValidator._REQUIRED.issubset(record.keys()) or any(
+            record[field] is None for field in EvidenceValidator.REQUIRED_FIELDS
+        ):
+            errors = [
+                f"Missing required field: {field}"
+                for field in EvidenceValidator.REQUIRED_FIELDS
+                if record.get(field) is None
+            ]
+            return False, errors
+
+        errors = EvidenceValidator._value_errors(
+            record["year"],
+            record["effect_point"],
+            record["ci_low"],
+            record["ci_high"],
+            record["n_treat"],
+            record["n_ctrl"],
+            record["effect_type"],
+            record["risk_of_bias"],
+            record["doi"],
+        )
+        return len(errors) == 0, errors
+
+    @staticmethod
+    def validate_record_obj(record: ExtractedEvidence) -> Tuple[bool, List[str]]:
+        """
+        Validate a single ExtractedEvidence record.
+
+        Same rules and messages as validate_record, but reads the slotted
+        attributes directly instead of hashing dict keys.
+
+        Returns:
+            (is_valid, list_of_errors)
+        """
+        year = record.year
+        effect_point = record.effect_point
+        ci_low = record.ci_low
+        ci_high = record.ci_high
+        n_treat = record.n_treat
+        n_ctrl = record.n_ctrl
+        effect_type = record.effect_type
+        risk_of_bias = record.risk_of_bias
+        doi = record.doi
+
         # Required fields
-        required = [
-            "study_id",
-            "year",
-            "design",
-            "effect_type",
-            "effect_point",
-            "ci_low",
-            "ci_high",
-            "n_treat",
-            "n_ctrl",
-            "risk_of_bias",
-            "doi",
-            "journal_id",
-        ]
-
-        for field in required:
-            if field not in record or record[field] is None:
-                errors.append(f"Missing required field: {field}")
-
-        if errors:
+        if (
+            record.study_id is None
+            or year is None
+            or record.design is None
+            or effect_type is None
+            or effect_point is None
+            or ci_low is None
+            or ci_high is None
+            or n_treat is None
+            or n_ctrl is None
+            or risk_of_bias is None
+            or doi is None
+            or record.journal_id is None
+        ):
+            errors = [
+                f"Missing required field: {field}"
+                for field in EvidenceValidator.REQUIRED_FIELDS
+                if getattr(record, field) is None
+            ]
             return False, errors
 
+        errors = EvidenceValidator._value_errors(
+            year, effect_point, ci_low, ci_high, n_treat, n_ctrl, effect_type, risk_of_bias, doi
+        )
+        return len(errors) == 0, errors
+
+    @staticmethod
+    def _value_errors(
+        year: Any,
+        effect_point: Any,
+        ci_low: Any,
+        ci_high: Any,
+        n_treat: Any,
+        n_ctrl: Any,
+        effect_type: Any,
+        risk_of_bias: Any,
+        doi: Any,
+    ) -> List[str]:
+        """Type/range/vocabulary checks shared by validate_record and validate_record_obj."""
+        errors = []
+
         # Type checks
         try:
-            year = int(record["year"])
-            if not (1990 <= year <= 2025):
-                errors.append(f"Year out of range: {year}")
+            year_value = int(year)
+            year_min, year_max = EvidenceValidator.YEAR_RANGE
+            if not (year_min <= year_value <= year_max):
+                errors.append(f"Year out of range: {year_value}")
         except (ValueError, TypeError):
-            errors.append(f"Invalid year: {record['year']}")
+            errors.append(f"Invalid year: {year}")
 
         try:
-            effect_point = float(record["effect_point"])
-            ci_low = float(record["ci_low"])
-            ci_high = float(record["ci_high"])
+            float(effect_point)
+            ci_low = float(ci_low)
+            ci_high = float(ci_high)
 
             # CI order check (for positive effects)
             # Note: For negative effects, order might be reversed
@@ -68,8 +171,8 @@ class EvidenceValidator:
             errors.append(f"Invalid numeric values: {e}")
 
         try:
-            n_treat = int(record["n_treat"])
-            n_ctrl = int(record["n_ctrl"])
+            n_treat = int(n_treat)
+            n_ctrl = int(n_ctrl)
 
             if n_treat <= 0:
                 errors.append(f"n_treat must be > 0, got {n_treat}")
@@ -80,37 +183,71 @@ class EvidenceValidator:
             errors.append(f"Invalid sample sizes: {e}")
 
         # Effect type
-        valid_effect_types = ["SMD", "MD", "OR", "RR", "HR"]
-        if record["effect_type"] not in valid_effect_types:
-            errors.append(f"Invalid effect_type: {record['effect_type']}")
+        if not _is_member(effect_type, EvidenceValidator.VALID_EFFECT_TYPES):
+            errors.append(f"Invalid effect_type: {effect_type}")
 
         # Risk of bias
-        valid_rob = ["low", "moderate", "high", "unclear"]
-        if record["risk_of_bias"] not in valid_rob:
-            errors.append(f"Invalid risk_of_bias: {record['risk_of_bias']}")
+        if not _is_member(risk_of_bias, EvidenceValidator.VALID_RISK_OF_BIAS):
+            errors.append(f"Invalid risk_of_bias: {risk_of_bias}")
 
         # DOI format (basic check)
-        doi = record["doi"]
         if not doi.startswith("10."):
             errors.append(f"Invalid DOI format: {doi}")
 
-        is_valid = len(errors) == 0
-        return is_valid, errors
+        return errors
 
     @staticmethod
     def validate_dataframe(df) -> Tuple[bool, Dict[int, List[str]]]:
         """
         Validate entire DataFrame.
 
+        Every rule is first evaluated column-wise to find rows that are
+        certainly valid; only the remaining rows go through validate_record,
+        which produces the exact error messages.
+
         Returns:
             (all_valid, {row_index: [errors]})
         """
-        import pandas as pd
+        return EvidenceValidator._validate_candidates(df, EvidenceValidator._valid_rows_mask(df))
+
+    @staticmethod
+    def validate_dataframe_polars(df) -> Tuple[bool, Dict[int, List[str]]]:
+        """
+        Validate a polars DataFrame.
+
+        The column-wise rules run as one lazy polars query (multithreaded,
+        over Arrow columns) without converting the frame to pandas; only the
+        rows it can't clear are turned into dicts for validate_record.
+        pandas input goes to validate_dataframe, since converting it costs
+        more than the query saves.
+
+        Returns:
+            (all_valid, {row_position: [errors]})
+        """
+        if pl is None:
+            raise ImportError("polars not installed. Install with: pip install polars")
+        if not isinstance(df, pl.DataFrame):
+            return EvidenceValidator.validate_dataframe(df)
 
         all_errors = {}
 
-        for idx, row in df.iterrows():
-            record = row.to_dict()
+        rows = df.with_row_index(_ROW_INDEX)
+        ok = EvidenceValidator._valid_rows_mask_polars(df)
+        if ok is not None:
+            # CI-order warning for rows that skip validate_record. Cleared rows
+            # imply numeric CI columns; otherwise (e.g. String) the comparison
+            # would fail, and validate_record reports the invalid values
+            if ok.any():
+                unusual = df.filter(ok & (pl.col("ci_low") > pl.col("ci_high")))
+                for low, high in zip(unusual["ci_low"], unusual["ci_high"]):
+                    logger.warning(
+                        f"CI order unusual: ci_low={float(low)}, ci_high={float(high)}. "
+                        "Check if effect is negative."
+                    )
+            rows = rows.filter(~ok)
+
+        for record in rows.iter_rows(named=True):
+            idx = record.pop(_ROW_INDEX)
             is_valid, errors = EvidenceValidator.validate_record(record)
             if not is_valid:
                 all_errors[idx] = errors
@@ -121,3 +258,151 @@ class EvidenceValidator:
             logger.error(f"Validation failed for {len(all_errors)} records")
 
         return all_valid, all_errors
+
+    @staticmethod
+    def _validate_candidates(df, ok) -> Tuple[bool, Dict[int, List[str]]]:
+        """Run validate_record on the rows the fast mask could not clear."""
+        all_errors = {}
+
+        if ok is not None:
+            # CI-order warning for rows that skip validate_record. Cleared rows
+            # imply numeric CI columns; otherwise (e.g. strings) the comparison
+            # would raise, and validate_record reports the invalid values
+            if ok.any():
+                ci_low = df.loc[ok, "ci_low"]
+                ci_high = df.loc[ok, "ci_high"]
+                unusual = ci_low > ci_high
+                for low, high in zip(ci_low[unusual], ci_high[unusual]):
+                    logger.warning(
+                        f"CI order unusual: ci_low={float(low)}, ci_high={float(high)}. "
+                        "Check if effect is negative."
+                    )
+            candidates = df[~ok]
+        else:
+            candidates = df
+
+        # to_dict("records") is one vectorized conversion, not a Series per row
+        for idx, record in zip(candidates.index, candidates.to_dict(orient="records")):
+            is_valid, errors = EvidenceValidator.validate_record(record)
+            if not is_valid:
+                all_errors[idx] = errors
+
+        all_valid = len(all_errors) == 0
+
+        if not all_valid:
+            logger.error(f"Validation failed for {len(all_errors)} records")
+
+        return all_valid, all_errors
+
+    @staticmethod
+    def _valid_rows_mask(df):
+        """
+        Boolean Series marking rows that pass every validate_record rule.
+
+        Conservative: rows whose values need Python-level coercion (object
+        columns, NaN, infinities) are left False so validate_record decides.
+        Returns None if a required column is absent.
+        """
+        import numpy as np
+        import pandas as pd
+        from pandas.api.types import is_integer_dtype, is_numeric_dtype
+
+        if not EvidenceValidator._REQUIRED.issubset(df.columns):
+            return None
+
+        def as_int(column: str):
+            # int() truncates floats; anything non-numeric goes to the slow path
+            values = df[column]
+            if is_integer_dtype(values):
+                return values, pd.Series(True, index=df.index)
+            if is_numeric_dtype(values):
+                finite = pd.Series(np.isfinite(values.to_numpy(dtype=float)), index=df.index)
+                return np.trunc(values.where(finite, 0)), finite
+            return None, pd.Series(False, index=df.index)
+
+        ok = df[list(EvidenceValidator.REQUIRED_FIELDS)].notna().all(axis=1)
+
+        year, year_ok = as_int("year")
+        ok &= year_ok
+        if year is not None:
+            ok &= year.between(*EvidenceValidator.YEAR_RANGE)
+
+        for column in ("effect_point", "ci_low", "ci_high"):
+            if not is_numeric_dtype(df[column]):
+                ok &= False
+
+        for column in ("n_treat", "n_ctrl"):
+            n, n_ok = as_int(column)
+            ok &= n_ok
+            if n is not None:
+                ok &= n > 0
+
+        ok &= df["effect_type"].isin(EvidenceValidator.VALID_EFFECT_TYPES)
+        ok &= df["risk_of_bias"].isin(EvidenceValidator.VALID_RISK_OF_BIAS)
+        try:
+            ok &= df["doi"].str.startswith("10.", na=False)
+        except AttributeError:  # no string values at all
+            ok &= False
+
+        return ok.astype(bool)
+
+    @staticmethod
+    def _valid_rows_mask_polars(df):
+        """
+        polars version of _valid_rows_mask (same conservative rules).
+
+        Returns a Boolean polars Series, or None if a required column is absent.
+        """
+        if not EvidenceValidator._REQUIRED.issubset(df.columns):
+            return None
+
+        schema = df.schema
+
+        def as_int(column: str):
+            # int() truncates floats; anything non-numeric goes to the slow path
+            dtype = schema[column]
+            if dtype.is_integer():
+                return pl.col(column), pl.lit(True)
+            if dtype.is_float():
+                return pl.col(column).floor(), pl.col(column).is_finite()
+            return None, pl.lit(False)
+
+        # Nulls, plus NaN (which pandas also treats as missing)
+        rules = [pl.col(column).is_not_null() for column in EvidenceValidator.REQUIRED_FIELDS]
+        rules.extend(
+            pl.col(column).is_not_nan()
+            for column in EvidenceValidator.REQUIRED_FIELDS
+            if schema[column].is_float()
+        )
+
+        year, year_ok = as_int("year")
+        rules.append(year_ok)
+        if year is not None:
+            rules.append(year.is_between(*EvidenceValidator.YEAR_RANGE))
+
+        for column in ("effect_point", "ci_low", "ci_high"):
+            if not (schema[column].is_integer() or schema[column].is_float()):
+                rules.append(pl.lit(False))
+
+        for column in ("n_treat", "n_ctrl"):
+            n, n_ok = as_int(column)
+            rules.append(n_ok)
+            if n is not None:
+                rules.append(n > 0)
+
+        for column, allowed in (
+            ("effect_type", EvidenceValidator.VALID_EFFECT_TYPES),
+            ("risk_of_bias", EvidenceValidator.VALID_RISK_OF_BIAS),
+        ):
+            if schema[column] == pl.String:
+                rules.append(pl.col(column).is_in(sorted(allowed)))
+            else:
+                rules.append(pl.lit(False))
+
+        if schema["doi"] == pl.String:
+            rules.append(pl.col("doi").str.starts_with("10."))
+        else:
+            rules.append(pl.lit(False))
+
+        ok = df.lazy().select(pl.all_horizontal(rules).fill_null(False).alias("ok")).collect()
+        return ok["ok"]
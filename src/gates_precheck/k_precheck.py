@@ -1,13 +1,26 @@
 """K-Gate Pre-check: Safety signal detection."""
 
+import functools
+import logging
 from pathlib import Path
-from typing import Dict, Any, List
-from dataclasses import dataclass
-from src.common.io_utils import load_yaml
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from dataclasses import dataclass, replace
+from src.common.io_utils import file_signature, load_yaml
 from src.common.logging import get_logger
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 logger = get_logger(__name__)
 
+# Keyword sources, in the order check_entry evaluates them
+HIGH_RISK, REGULATORY, INTERACTION = range(3)
+
+# Distinct product verdicts memoized per checker
+CHECK_CACHE_SIZE = 1024
+
 
 @dataclass
 class KPrecheckResult:
@@ -23,6 +36,83 @@ class KPrecheckResult:
             self.references = []
 
 
+class _KeywordIndex:
+    """
+    Finds which config keywords occur as substrings of a product name.
+
+    Every keyword is tagged with (source, position) records so matches can
+    be replayed in config order. Uses a single Aho-Corasick scan when
+    pyahocorasick is installed. Otherwise keywords are bucketed by their
+    leading trigram, and only keywords whose trigram appears in the product
+    get an ``in`` check, so products sharing no trigram with the vocabulary
+    are rejected after one set intersection.
+    """
+
+    __slots__ = ("_tags", "_automaton", "_by_trigram", "_short")
+
+    def __init__(self, keywords: Iterable[Tuple[str, int, int]]):
+        self._tags: Dict[str, List[Tuple[int, int]]] = {}
+        for keyword, source, position in keywords:
+            self._tags.setdefault(keyword, []).append((source, position))
+
+        self._automaton = None
+        # The empty string is a substring of everything, which the automaton can't
+        # express; an empty vocabulary can't be compiled (the fallback finds nothing)
+        if ahocorasick is not None and self._tags and "" not in self._tags:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self._tags:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+
+        self._by_trigram: Dict[str, List[str]] = {}
+        self._short: List[str] = []  # too short to bucket; always checked
+        for keyword in self._tags:
+            if len(keyword) < 3:
+                self._short.append(keyword)
+            else:
+                self._by_trigram.setdefault(keyword[:3], []).append(keyword)
+
+    def scan(self, text: str) -> List[Tuple[int, int]]:
+        """Return the (source, position) tags of all keywords in text, in config order."""
+        if self._automaton is not None:
+            found = {keyword for _, keyword in self._automaton.iter(text)}
+        else:
+            found = {keyword for keyword in self._short if keyword in text}
+            trigrams = {text[i : i + 3] for i in range(len(text) - 2)}
+            for trigram in trigrams.intersection(self._by_trigram):
+                found.update(keyword for keyword in self._by_trigram[trigram] if keyword in text)
+        return sorted(tag for keyword in found for tag in self._tags[keyword])
+
+
+@functools.lru_cache(maxsize=16)
+def _lookup_tables(
+    path: str, mtime_ns: int, size: int
+) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any], _KeywordIndex]:
+    """
+    Build the name-keyed lookup tables and keyword index for a K-precheck config.
+
+    Cached on the file's (path, mtime_ns, size), so instances built from an
+    unchanged config share the tables. Treat them as read-only.
+    """
+    config = load_yaml(path)
+    high_risk_substances = {item["name"]: item for item in config.get("high_risk_substances", [])}
+    dose_thresholds = {item["substance"]: item for item in config.get("dose_thresholds", [])}
+    regulatory_warnings = {
+        item["substance"]: item for item in config.get("regulatory_warnings", [])
+    }
+    keyword_index = _KeywordIndex(
+        [
+            *((name, HIGH_RISK, i) for i, name in enumerate(high_risk_substances)),
+            *((name, REGULATORY, i) for i, name in enumerate(regulatory_warnings)),
+            *(
+                (interaction["supplement"], INTERACTION, i)
+                for i, interaction in enumerate(config.get("interactions", []))
+            ),
+        ]
+    )
+    return high_risk_substances, dose_thresholds, regulatory_warnings, keyword_index
+
+
 class KPrecheck:
     """
     K-Gate Pre-screening.
@@ -33,17 +123,26 @@ class KPrecheck:
 
     def __init__(self, config_path: Path | str):
         self.config = load_yaml(config_path)
-        self.high_risk_substances = {
-            item["name"]: item for item in self.config.get("high_risk_substances", [])
-        }
-        self.dose_thresholds = {
-            item["substance"]: item for item in self.config.get("dose_thresholds", [])
-        }
+        (
+            self.high_risk_substances,
+            self.dose_thresholds,
+            self.regulatory_warnings,
+            self._keyword_index,
+        ) = _lookup_tables(*file_signature(config_path))
         self.interactions = self.config.get("interactions", [])
         self.contraindications = self.config.get("contraindications", [])
-        self.regulatory_warnings = {
-            item["substance"]: item for item in self.config.get("regulatory_warnings", [])
-        }
+        self._high_risk_items = list(self.high_risk_substances.items())
+        self._regulatory_items = list(self.regulatory_warnings.items())
+        # Verdicts are a pure function of the product for this config version
+        self._check_cached = functools.lru_cache(maxsize=CHECK_CACHE_SIZE)(self._evaluate)
+
+    @classmethod
+    def shared(cls, config_path: Path | str) -> "KPrecheck":
+        """
+        Process-wide checker for config_path, so memoized verdicts carry over
+        between entries; a fresh one is built when the file changes.
+        """
+        return _shared_checker(cls, *file_signature(config_path))
 
     def check_entry(
         self,
@@ -60,6 +159,18 @@ class KPrecheck:
         Returns:
             KPrecheckResult with verdict and safety signals
         """
+        result, log = self._check_cached(product)
+        if log is not None:
+            logger.log(*log)
+        # Fresh lists so callers can't mutate the memoized result
+        return replace(
+            result,
+            safety_signals=list(result.safety_signals),
+            references=list(result.references),
+        )
+
+    def _evaluate(self, product: str) -> Tuple[KPrecheckResult, Optional[Tuple[int, str]]]:
+        """Uncached check; returns the result and its (level, message) log line, if any."""
         safety_signals = []
         verdict = "pass"
         reason = ""
@@ -68,9 +179,17 @@ class KPrecheck:
         # Normalize product name
         product_normalized = product.lower().replace("-", "_").replace(" ", "_")
 
-        # Check high-risk substances
-        for substance_name, substance_info in self.high_risk_substances.items():
-            if substance_name in product_normalized:
+        matches = self._keyword_index.scan(product_normalized)
+        if not matches:
+            # Common case: no vocabulary keyword in the product at all
+            return KPrecheckResult(verdict=verdict, safety_signals=safety_signals), None
+
+        # One keyword scan finds every matching record; replaying the matches
+        # in config order keeps the high-risk → regulatory → interaction
+        # evaluation (and early returns) of the per-table loops
+        for source, position in matches:
+            if source == HIGH_RISK:
+                substance_name, substance_info = self._high_risk_items[position]
                 action = substance_info.get("action", "warn")
                 reason_text = substance_info.get("reason", "")
                 ref = substance_info.get("reference", "")
@@ -81,20 +200,21 @@ class KPrecheck:
                 if action == "reject":
                     verdict = "reject"
                     reason = f"Prohibited substance: {reason_text}"
-                    logger.warning(f"K-precheck REJECT: {product}. Reason: {reason}")
-                    return KPrecheckResult(
-                        verdict=verdict,
-                        safety_signals=safety_signals,
-                        reason=reason,
-                        references=references,
+                    return (
+                        KPrecheckResult(
+                            verdict=verdict,
+                            safety_signals=safety_signals,
+                            reason=reason,
+                            references=references,
+                        ),
+                        (logging.WARNING, f"K-precheck REJECT: {product}. Reason: {reason}"),
                     )
                 elif action in ["flag", "warn"] and verdict == "pass":
                     verdict = action
                     reason = reason_text
 
-        # Check regulatory warnings
-        for substance_name, warning_info in self.regulatory_warnings.items():
-            if substance_name in product_normalized:
+            elif source == REGULATORY:
+                substance_name, warning_info = self._regulatory_items[position]
                 action = warning_info.get("action", "flag")
                 agency = warning_info.get("agency", "")
                 warning_text = warning_info.get("warning", "")
@@ -104,16 +224,18 @@ class KPrecheck:
                 if action == "reject":
                     verdict = "reject"
                     reason = f"{agency} warning: {warning_text}"
-                    return KPrecheckResult(
-                        verdict=verdict,
-                        safety_signals=safety_signals,
-                        reason=reason,
-                        references=references,
+                    return (
+                        KPrecheckResult(
+                            verdict=verdict,
+                            safety_signals=safety_signals,
+                            reason=reason,
+                            references=references,
+                        ),
+                        None,
                     )
 
-        # Check interactions
-        for interaction in self.interactions:
-            if interaction["supplement"] in product_normalized:
+            else:
+                interaction = self.interactions[position]
                 severity = interaction.get("severity", "moderate")
                 interacts = ", ".join(interaction.get("interacts_with", []))
                 safety_signals.append(
@@ -128,12 +250,24 @@ class KPrecheck:
         if safety_signals and verdict == "pass":
             verdict = "note"
 
+        log = None
         if verdict != "pass":
-            logger.info(f"K-precheck {verdict.upper()}: {product}. Signals: {len(safety_signals)}")
+            log = (
+                logging.INFO,
+                f"K-precheck {verdict.upper()}: {product}. Signals: {len(safety_signals)}",
+            )
 
-        return KPrecheckResult(
-            verdict=verdict,
-            safety_signals=safety_signals,
-            reason=reason,
-            references=references,
+        return (
+            KPrecheckResult(
+                verdict=verdict,
+                safety_signals=safety_signals,
+                reason=reason,
+                references=references,
+            ),
+            log,
         )
+
+
+@functools.lru_cache(maxsize=16)
+def _shared_checker(cls: type, path: str, mtime_ns: int, size: int) -> KPrecheck:
+    return cls(path)
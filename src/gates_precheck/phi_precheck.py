@@ -1,14 +1,23 @@
 """Φ-Gate Pre-check: Physical/physiological plausibility screening."""
 
+import functools
+import logging
 import re
 from pathlib import Path
-from typing import Dict, Any, Tuple
-from dataclasses import dataclass
-from src.common.io_utils import load_yaml
+from typing import Dict, Any, List, Optional, Pattern, Tuple
+from dataclasses import dataclass, replace
+from src.common.io_utils import file_signature, load_yaml
 from src.common.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Backreferences are renumbered/renamed inside an alternation, so patterns
+# using them can't join the combined prefilter.
+_BACKREFERENCE = re.compile(r"\\\d|\(\?P=")
+
+# Distinct (intervention_type, product, outcome) verdicts memoized per checker
+CHECK_CACHE_SIZE = 1024
+
 
 @dataclass
 class PhiPrecheckResult:
@@ -19,6 +28,80 @@ class PhiPrecheckResult:
     matched_rule: str = ""
 
 
+def _compile(pattern: str) -> Optional[Pattern]:
+    """Compile a case-insensitive rule pattern (None if invalid)."""
+    try:
+        return re.compile(pattern, re.IGNORECASE)
+    except re.error:
+        logger.error(f"Invalid regex pattern: {pattern}")
+        return None
+
+
+def _build_prefilter(patterns: List[str]) -> Optional[Pattern]:
+    """
+    Union of all intervention patterns as one alternation.
+
+    Returns None (no prefiltering) if any pattern can't be safely combined.
+    """
+    if not patterns or any(_BACKREFERENCE.search(p) for p in patterns):
+        return None
+    try:
+        return re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+    except re.error:
+        return None
+
+
+# (intervention_re, outcome_re, verdict, reason, matched_rule)
+_Rule = Tuple[Pattern, Pattern, str, str, str]
+
+# Rule actions that decide the verdict; any other action never fires
+_ACTIONS = ("reject", "warn")
+
+
+@functools.lru_cache(maxsize=16)
+def _compiled_rules(path: str, mtime_ns: int, size: int) -> Tuple[List[_Rule], Optional[Pattern]]:
+    """
+    Compile a Φ-precheck config's hard exclusions.
+
+    Cached on the file's (path, mtime_ns, size), so instances built from an
+    unchanged config share the compiled rules (and invalid patterns are
+    only logged once per config version).
+
+    Rules that can never fire (an action other than reject/warn, or an
+    invalid pattern) are dropped here, and each kept rule carries its
+    verdict, reason and matched_rule label so check_entry() does no
+    per-call dict lookups.
+
+    Returns:
+        (rules, prefilter): kept rules in config order, plus the union
+        prefilter over their intervention patterns (or None)
+    """
+    hard_exclusions = load_yaml(path).get("hard_exclusions", [])
+    rules: List[_Rule] = []
+    intervention_patterns = []
+    for exclusion in hard_exclusions:
+        intervention_pattern = exclusion.get("intervention_pattern", "")
+        outcome_pattern = exclusion.get("outcome_pattern", "")
+        intervention_re = _compile(intervention_pattern)
+        outcome_re = _compile(outcome_pattern)
+        action = exclusion.get("action", "warn")
+        if intervention_re is None or outcome_re is None or action not in _ACTIONS:
+            continue
+
+        rules.append(
+            (
+                intervention_re,
+                outcome_re,
+                action,
+                exclusion.get("reason", ""),
+                f"{intervention_pattern} → {outcome_pattern}",
+            )
+        )
+        intervention_patterns.append(intervention_pattern)
+
+    return rules, _build_prefilter(intervention_patterns)
+
+
 class PhiPrecheck:
     """
     Φ-Gate Pre-screening.
@@ -33,6 +116,18 @@ class PhiPrecheck:
         self.route_checks = self.config.get("route_checks", {})
         self.category_requirements = self.config.get("category_requirements", {})
 
+        self._rules, self._intervention_prefilter = _compiled_rules(*file_signature(config_path))
+        # Verdicts are a pure function of the inputs for this config version
+        self._check_cached = functools.lru_cache(maxsize=CHECK_CACHE_SIZE)(self._evaluate)
+
+    @classmethod
+    def shared(cls, config_path: Path | str) -> "PhiPrecheck":
+        """
+        Process-wide checker for config_path, so memoized verdicts carry over
+        between entries; a fresh one is built when the file changes.
+        """
+        return _shared_checker(cls, *file_signature(config_path))
+
     def check_entry(
         self,
         intervention_type: str,
@@ -50,48 +145,48 @@ class PhiPrecheck:
         Returns:
             PhiPrecheckResult with verdict and reason
         """
-        # Check hard exclusions
-        for exclusion in self.hard_exclusions:
-            intervention_pattern = exclusion.get("intervention_pattern", "")
-            outcome_pattern = exclusion.get("outcome_pattern", "")
-            action = exclusion.get("action", "warn")
-            reason = exclusion.get("reason", "")
-
-            # Build search string
-            search_str = f"{intervention_type} {product}"
-
-            if self._matches_pattern(search_str, intervention_pattern):
-                if self._matches_pattern(outcome, outcome_pattern):
-                    if action == "reject":
-                        logger.warning(
-                            f"Φ-precheck REJECT: {intervention_type}/{product} → {outcome}. Reason: {reason}"
-                        )
-                        return PhiPrecheckResult(
-                            verdict="reject",
-                            reason=reason,
-                            matched_rule=f"{intervention_pattern} → {outcome_pattern}",
-                        )
-                    elif action == "warn":
-                        logger.info(
-                            f"Φ-precheck WARN: {intervention_type}/{product} → {outcome}. Reason: {reason}"
-                        )
-                        return PhiPrecheckResult(
-                            verdict="warn",
-                            reason=reason,
-                            matched_rule=f"{intervention_pattern} → {outcome_pattern}",
-                        )
+        result, log = self._check_cached(intervention_type, product, outcome)
+        if log is not None:
+            logger.log(*log)
+        return replace(result)
 
-        # If no exclusions matched, pass
-        return PhiPrecheckResult(verdict="pass")
+    def _evaluate(
+        self,
+        intervention_type: str,
+        product: str,
+        outcome: str,
+    ) -> Tuple[PhiPrecheckResult, Optional[Tuple[int, str]]]:
+        """Uncached check; returns the result and its (level, message) log line, if any."""
+        # Build search string
+        search_str = f"{intervention_type} {product}"
+
+        # One combined search rejects the common no-rule-applies case
+        if self._intervention_prefilter is not None and not self._intervention_prefilter.search(
+            search_str
+        ):
+            return PhiPrecheckResult(verdict="pass"), None
+
+        # Check hard exclusions (in config order; first reject/warn wins)
+        for intervention_re, outcome_re, verdict, reason, matched_rule in self._rules:
+            if intervention_re.search(search_str) and outcome_re.search(outcome):
+                level = logging.WARNING if verdict == "reject" else logging.INFO
+                message = (
+                    f"Φ-precheck {verdict.upper()}: {intervention_type}/{product} → {outcome}. "
+                    f"Reason: {reason}"
+                )
+                result = PhiPrecheckResult(
+                    verdict=verdict, reason=reason, matched_rule=matched_rule
+                )
+                return result, (level, message)
 
-    def _matches_pattern(self, text: str, pattern: str) -> bool:
-        """Check if text matches regex pattern."""
-        try:
-            return bool(re.search(pattern, text, re.IGNORECASE))
-        except re.error:
-            logger.error(f"Invalid regex pattern: {pattern}")
-            return False
+        # If no exclusions matched, pass
+        return PhiPrecheckResult(verdict="pass"), None
 
     def get_category_requirements(self, intervention_type: str) -> Dict[str, Any]:
         """Get requirements for intervention category."""
         return self.category_requirements.get(intervention_type, {})
+
+
+@functools.lru_cache(maxsize=16)
+def _shared_checker(cls: type, path: str, mtime_ns: int, size: int) -> PhiPrecheck:
+    return cls(path)
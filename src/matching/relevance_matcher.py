@@ -1,7 +1,11 @@
 """Match papers to entries based on relevance."""
 
-from typing import List, Dict, Any
+import functools
+import heapq
+from collections import Counter
+from typing import Callable, Iterable, Iterator, List, Dict, Any, Optional, Sequence, Tuple
 from dataclasses import dataclass
+import numpy as np
 from src.catalog.catalog_loader import EntryDefinition
 from src.search.pubmed_client import PubMedArticle
 from src.common.logging import get_logger
@@ -23,6 +27,73 @@ class MatchResult:
     matched: bool
 
 
+@functools.lru_cache(maxsize=4096)
+def _extract_keywords(text: str) -> Tuple[str, ...]:
+    # Simple: split by hyphens/underscores/spaces
+    return tuple(text.lower().replace("-", " ").replace("_", " ").split())
+
+
+@functools.lru_cache(maxsize=4096)
+def _paper_text(title: str, abstract: str) -> str:
+    # Lowercased once per paper; candidate papers recur across entries in a run
+    return f"{title} {abstract}".lower()
+
+
+class PaperIndex:
+    """
+    Keyword hit columns over a fixed set of papers, shared across entries.
+
+    Each keyword is searched once over all papers (the same lowercase
+    substring test as RelevanceMatcher), so entries that share keywords or
+    candidate papers reuse the same column. Columns for keywords not seen
+    at build time are added on first use.
+    """
+
+    def __init__(self, papers: Sequence[PubMedArticle], keywords: Iterable[str] = ()):
+        """
+        Build index.
+
+        Args:
+            papers: Candidate papers (e.g., the union fetched for a catalog build)
+            keywords: Keywords to search up front
+        """
+        self._texts = np.array(
+            [_paper_text(paper.title, paper.abstract) for paper in papers], dtype=str
+        )
+        self._rows: Dict[str, int] = {}
+        for i, paper in enumerate(papers):
+            self._rows.setdefault(paper.pmid, i)
+        self._columns: Dict[str, np.ndarray] = {}
+        for keyword in keywords:
+            self._column(keyword)
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def _column(self, keyword: str) -> np.ndarray:
+        column = self._columns.get(keyword)
+        if column is None:
+            column = self._columns[keyword] = np.char.find(self._texts, keyword) >= 0
+        return column
+
+    def rows(self, papers: Sequence[PubMedArticle]) -> Optional[np.ndarray]:
+        """Index rows for papers, or None if any paper is not in the index."""
+        try:
+            return np.array([self._rows[paper.pmid] for paper in papers], dtype=np.intp)
+        except KeyError:
+            return None
+
+    def keyword_overlap(self, keywords: Sequence[str], rows: np.ndarray) -> np.ndarray:
+        """Same scores as RelevanceMatcher._keyword_overlap, read from the index."""
+        if not keywords:
+            return np.zeros(len(rows))
+
+        matches = np.zeros(len(rows))
+        for keyword, count in Counter(keywords).items():
+            matches += count * self._column(keyword)[rows]
+        return matches / len(keywords)
+
+
 class RelevanceMatcher:
     """
     Match papers to entry definitions based on relevance criteria.
@@ -30,6 +101,9 @@ class RelevanceMatcher:
     Uses simple keyword matching (can be enhanced with LLM later).
     """
 
+    # Study-design keywords (constant across entries)
+    DESIGN_KEYWORDS = ("randomized", "controlled trial", "rct", "placebo")
+
     def __init__(self, relevance_threshold: float = 0.7):
         """
         Initialize matcher.
@@ -39,10 +113,32 @@ class RelevanceMatcher:
         """
         self.relevance_threshold = relevance_threshold
 
+    def build_index(
+        self,
+        papers: Sequence[PubMedArticle],
+        entries: Iterable[EntryDefinition] = (),
+    ) -> PaperIndex:
+        """
+        Build a keyword index over papers for scoring many entries.
+
+        Args:
+            papers: All candidate papers (e.g., one catalog build's fetch)
+            entries: Entries whose keywords are searched up front
+
+        Returns:
+            PaperIndex to pass to match_papers()
+        """
+        keywords = dict.fromkeys(self.DESIGN_KEYWORDS)
+        for entry in entries:
+            keywords.update(dict.fromkeys(self._extract_keywords(entry.product)))
+            keywords.update(dict.fromkeys(self._extract_keywords(entry.outcome)))
+        return PaperIndex(papers, keywords)
+
     def match_papers(
         self,
         entry: EntryDefinition,
         papers: List[PubMedArticle],
+        index: Optional[PaperIndex] = None,
     ) -> List[MatchResult]:
         """
         Match papers to entry and score relevance.
@@ -50,90 +146,121 @@ class RelevanceMatcher:
         Args:
             entry: Entry definition
             papers: List of candidate papers
+            index: Optional shared index from build_index() covering papers
+                (scores are identical; keyword searches are reused)
 
         Returns:
             List of MatchResult, sorted by relevance score
         """
-        results = []
-
-        for paper in papers:
-            result = self._score_paper(entry, paper)
-            results.append(result)
-
-        # Sort by relevance score
-        results.sort(key=lambda x: x.relevance_score, reverse=True)
+        return list(self.match_stream(entry, papers, index))
 
-        matched_count = sum(1 for r in results if r.matched)
-        logger.info(
-            f"Matched {matched_count}/{len(results)} papers for entry {entry.id} "
-            f"(threshold={self.relevance_threshold})"
-        )
-
-        return results
-
-    def _score_paper(
+    def match_stream(
         self,
         entry: EntryDefinition,
-        paper: PubMedArticle,
-    ) -> MatchResult:
+        papers: Iterable[PubMedArticle],
+        index: Optional[PaperIndex] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[MatchResult]:
         """
-        Score individual paper against entry.
+        Lazily yield match results in descending relevance order.
+
+        Ranking needs every score, so all papers are scored up front
+        (vectorized), but MatchResult objects are only built as the caller
+        consumes them; callers that stop early skip the rest.
 
-        Criteria (from extraction_policy.yaml):
-        - intervention_match: 0.3
-        - outcome_match: 0.3
-        - design_match: 0.2
-        - population_match: 0.2
+        Args:
+            entry: Entry definition
+            papers: Candidate papers
+            index: Optional shared index from build_index() covering papers
+            limit: Yield at most this many (top-scored) results; only those
+                are ranked
+
+        Yields:
+            MatchResult, sorted by relevance score
         """
-        # Prepare search text
-        paper_text = f"{paper.title} {paper.abstract}".lower()
+        papers = papers if isinstance(papers, Sequence) else list(papers)
+        if not papers:
+            logger.info(
+                f"Matched 0/0 papers for entry {entry.id} (threshold={self.relevance_threshold})"
+            )
+            return
 
+        rows = index.rows(papers) if index is not None else None
+        overlap: Callable[[Sequence[str]], np.ndarray]
+        if rows is not None:
+            overlap = functools.partial(index.keyword_overlap, rows=rows)
+        else:
+            # Prepare search text (one array, scored per keyword across all papers)
+            paper_texts = np.array([_paper_text(paper.title, paper.abstract) for paper in papers])
+            overlap = functools.partial(self._keyword_overlap, texts=paper_texts)
+
+        # Criteria (from extraction_policy.yaml):
         # 1. Intervention match (0.3)
         intervention_keywords = self._extract_keywords(entry.product)
-        intervention_match = self._keyword_overlap(intervention_keywords, paper_text)
+        intervention_match = overlap(intervention_keywords)
 
         # 2. Outcome match (0.3)
         outcome_keywords = self._extract_keywords(entry.outcome)
-        outcome_match = self._keyword_overlap(outcome_keywords, paper_text)
+        outcome_match = overlap(outcome_keywords)
 
         # 3. Design match (0.2)
-        design_keywords = ["randomized", "controlled trial", "rct", "placebo"]
-        design_match = self._keyword_overlap(design_keywords, paper_text)
+        design_match = overlap(self.DESIGN_KEYWORDS)
 
         # 4. Population match (0.2) - placeholder (would need more info)
         population_match = 0.5  # Default neutral
 
         # Weighted score
-        relevance_score = (
+        relevance_scores = (
             0.3 * intervention_match
             + 0.3 * outcome_match
             + 0.2 * design_match
             + 0.2 * population_match
         )
 
-        matched = relevance_score >= self.relevance_threshold
-
-        return MatchResult(
-            pmid=paper.pmid,
-            doi=paper.doi or "",
-            relevance_score=relevance_score,
-            intervention_match=intervention_match,
-            outcome_match=outcome_match,
-            design_match=design_match,
-            population_match=population_match,
-            matched=matched,
+        matched = relevance_scores >= self.relevance_threshold
+
+        # Sort by relevance score (stable, so ties keep input order); for a small
+        # limit, heapq.nlargest picks the same top results in O(N log limit)
+        if limit is not None and limit < len(papers):
+            order = heapq.nlargest(
+                limit, range(len(papers)), key=relevance_scores.tolist().__getitem__
+            )
+        else:
+            order = np.argsort(-relevance_scores, kind="stable").tolist()
+
+        matched_count = int(matched.sum())
+        logger.info(
+            f"Matched {matched_count}/{len(papers)} papers for entry {entry.id} "
+            f"(threshold={self.relevance_threshold})"
         )
 
-    def _extract_keywords(self, text: str) -> List[str]:
-        """Extract keywords from text."""
-        # Simple: split by hyphens/underscores/spaces
-        keywords = text.lower().replace("-", " ").replace("_", " ").split()
-        return keywords
+        for i in order:
+            yield MatchResult(
+                pmid=papers[i].pmid,
+                doi=papers[i].doi or "",
+                relevance_score=float(relevance_scores[i]),
+                intervention_match=float(intervention_match[i]),
+                outcome_match=float(outcome_match[i]),
+                design_match=float(design_match[i]),
+                population_match=population_match,
+                matched=bool(matched[i]),
+            )
+
+    def _extract_keywords(self, text: str) -> Tuple[str, ...]:
+        """Extract keywords from text (memoized; products/outcomes repeat across entries)."""
+        return _extract_keywords(text)
 
-    def _keyword_overlap(self, keywords: List[str], text: str) -> float:
-        """Compute keyword overlap score (0-1)."""
+    def _keyword_overlap(self, keywords: Sequence[str], texts: np.ndarray) -> np.ndarray:
+        """
+        Compute keyword overlap scores (0-1) for each text.
+
+        Each distinct keyword is a single vectorized substring search over
+        all texts; repeated keywords count once per occurrence.
+        """
         if not keywords:
-            return 0.0
+            return np.zeros(len(texts))
 
-        matches = sum(1 for kw in keywords if kw in text)
+        matches = np.zeros(len(texts))
+        for keyword, count in Counter(keywords).items():
+            matches += count * (np.char.find(texts, keyword) >= 0)
         return matches / len(keywords)
@@ -0,0 +1,123 @@
+"""Response cache shared by the literature search and extraction clients."""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Hashable, Optional, Tuple
+
+from src.common.hashing import sha256_str
+from src.common.io_utils import loads_json
+from src.common.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Default time-to-live for cached responses (7 days)
+DEFAULT_EXPIRE_AFTER = 7 * 86400
+# Entries kept in the in-memory layer before the least recently used is evicted
+DEFAULT_MEMORY_ENTRIES = 4096
+
+
+class ResponseCache:
+    """
+    Two-level (memory + optional disk) cache for search responses.
+
+    Values must be JSON-serializable. The memory layer is a thread-safe LRU;
+    the disk layer stores one JSON file per key under ``cache_dir/namespace``
+    so results persist across runs and are shared between processes.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        cache_dir: Optional[Path | str] = None,
+        expire_after: Optional[float] = DEFAULT_EXPIRE_AFTER,
+        max_memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        refresh: bool = False,
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            namespace: Subdirectory / key prefix (e.g., "pubmed_search")
+            cache_dir: Root directory for the disk layer (None = memory only)
+            expire_after: Seconds before an entry goes stale (None = never)
+            max_memory_entries: Size bound of the in-memory LRU
+            refresh: Ignore entries stored before this instance was created
+                (they are overwritten as fresh responses come in)
+        """
+        self.namespace = namespace
+        self.cache_dir = Path(cache_dir) / namespace if cache_dir else None
+        self.expire_after = expire_after
+        self.max_memory_entries = max_memory_entries
+        # Entries created before this are only honoured if refresh is off
+        self._not_before = time.time() if refresh else None
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, key: Hashable) -> str:
+        return sha256_str(f"{self.namespace}:{json.dumps(key, sort_keys=True)}")
+
+    def _is_fresh(self, created: float) -> bool:
+        if self._not_before is not None and created < self._not_before:
+            return False
+        return self.expire_after is None or time.time() - created < self.expire_after
+
+    def _path(self, digest: str) -> Path:
+        return self.cache_dir / digest[:2] / f"{digest}.json"
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for key, or None if missing/expired."""
+        digest = self._key(key)
+
+        with self._lock:
+            hit = self._memory.get(digest)
+            if hit is not None:
+                if self._is_fresh(hit[0]):
+                    self._memory.move_to_end(digest)
+                    return hit[1]
+                del self._memory[digest]
+
+        if self.cache_dir is None:
+            return None
+
+        try:
+            with open(self._path(digest), "rb") as f:
+                record = loads_json(f.read())
+        except (OSError, ValueError):
+            return None
+
+        if not self._is_fresh(record["created"]):
+            return None
+
+        self._remember(digest, record["created"], record["value"])
+        return record["value"]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value under key in memory and (if configured) on disk."""
+        digest = self._key(key)
+        created = time.time()
+        self._remember(digest, created, value)
+
+        if self.cache_dir is None:
+            return
+
+        # Write atomically so concurrent readers never see a partial file
+        path = self._path(digest)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"created": created, "value": value}, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Failed to write cache entry {path}: {e}")
+
+    def _remember(self, digest: str, created: float, value: Any) -> None:
+        with self._lock:
+            self._memory[digest] = (created, value)
+            self._memory.move_to_end(digest)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
@@ -1,10 +1,18 @@
 """Crossref API client (supplementary to PubMed)."""
 
-import time
+import asyncio
 import requests
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional
+from dataclasses import asdict, dataclass
 from src.common.logging import get_logger
+from src.search.cache import DEFAULT_EXPIRE_AFTER, ResponseCache
+from src.search.rate_limit import RateLimiter
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 logger = get_logger(__name__)
 
@@ -28,25 +36,34 @@ class CrossrefClient:
     Uses "polite pool" with 50 requests/second.
     """
 
-    def __init__(self, mailto: str):
+    def __init__(
+        self,
+        mailto: str,
+        cache_dir: Optional[Path | str] = None,
+        cache_expire_after: Optional[float] = DEFAULT_EXPIRE_AFTER,
+    ):
         """
         Initialize Crossref client.
 
         Args:
             mailto: Email for polite pool access
+            cache_dir: Persist search results here (None = in-memory only)
+            cache_expire_after: Seconds before cached responses go stale (None = never)
         """
         self.mailto = mailto
         self.base_url = "https://api.crossref.org/works"
         self.rate_limit = 50
-        self.last_request_time = 0
+        self._rate_limiter = RateLimiter(self.rate_limit)
+
+        # Keep-alive connection reuse across searches
+        self._session = requests.Session()
+
+        # Cache hits skip both the network and _throttle()
+        self._search_cache = ResponseCache("crossref_search", cache_dir, cache_expire_after)
 
     def _throttle(self):
-        """Respect rate limits."""
-        elapsed = time.time() - self.last_request_time
-        min_interval = 1.0 / self.rate_limit
-        if elapsed < min_interval:
-            time.sleep(min_interval - elapsed)
-        self.last_request_time = time.time()
+        """Respect rate limits (shared by all threads using this client)."""
+        self._rate_limiter.acquire()
 
     def search(
         self,
@@ -65,8 +82,49 @@ class CrossrefClient:
         Returns:
             List of CrossrefArticle objects
         """
+        cached = self._cached_search(query, max_results, filters)
+        if cached is not None:
+            return cached
+
         self._throttle()
+        return self._fetch_search(query, max_results, filters)
+
+    async def search_async(
+        self,
+        query: str,
+        max_results: int = 100,
+        filters: Optional[Dict[str, str]] = None,
+    ) -> List[CrossrefArticle]:
+        """
+        Async variant of search().
 
+        Waits for the rate limiter with asyncio.sleep and runs the blocking
+        HTTP request in a worker thread, so the event loop stays free.
+        """
+        cached = self._cached_search(query, max_results, filters)
+        if cached is not None:
+            return cached
+
+        await self._rate_limiter.acquire_async()
+        return await asyncio.to_thread(self._fetch_search, query, max_results, filters)
+
+    @staticmethod
+    def _cache_key(query: str, max_results: int, filters: Optional[Dict[str, str]]):
+        return (query, max_results, sorted((filters or {}).items()))
+
+    def _cached_search(
+        self, query: str, max_results: int, filters: Optional[Dict[str, str]]
+    ) -> Optional[List[CrossrefArticle]]:
+        cached = self._search_cache.get(self._cache_key(query, max_results, filters))
+        if cached is None:
+            return None
+        logger.info(f"Crossref search (cached): {query} → {len(cached)} articles")
+        return [CrossrefArticle(**item) for item in cached]
+
+    def _fetch_search(
+        self, query: str, max_results: int, filters: Optional[Dict[str, str]]
+    ) -> List[CrossrefArticle]:
+        """Run (and cache) one works query; the caller handles rate limiting."""
         params = {
             "query": query,
             "rows": min(max_results, 1000),
@@ -74,29 +132,48 @@ class CrossrefClient:
         }
 
         if filters:
-            for key, value in filters.items():
-                params[f"filter"] = f"{key}:{value}"
+            # Crossref takes all filters comma-joined in a single parameter
+            params["filter"] = ",".join(f"{key}:{value}" for key, value in filters.items())
 
         logger.info(f"Crossref search: {query} (max={max_results})")
 
         try:
-            response = requests.get(self.base_url, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-
-            articles = []
-            for item in data.get("message", {}).get("items", []):
-                article = self._parse_item(item)
-                if article:
-                    articles.append(article)
+            with self._session.get(
+                self.base_url, params=params, timeout=30, stream=ijson is not None
+            ) as response:
+                response.raise_for_status()
+                articles = []
+                for item in self._iter_items(response):
+                    article = self._parse_item(item)
+                    if article:
+                        articles.append(article)
 
             logger.info(f"Found {len(articles)} Crossref articles")
+            self._search_cache.set(
+                self._cache_key(query, max_results, filters),
+                [asdict(article) for article in articles],
+            )
             return articles
 
         except Exception as e:
             logger.error(f"Crossref search failed: {e}")
             return []
 
+    def _iter_items(self, response: requests.Response) -> Iterator[Dict]:
+        """
+        Yield the result items of a works response.
+
+        With ijson, items are stream-parsed from the socket one at a time, so
+        a 1000-row page is never held in memory as a whole. Without it, the
+        full body is decoded with response.json().
+        """
+        if ijson is None:
+            yield from response.json().get("message", {}).get("items", [])
+            return
+
+        response.raw.decode_content = True
+        yield from ijson.items(response.raw, "message.items.item", use_float=True)
+
     def _parse_item(self, item: Dict) -> Optional[CrossrefArticle]:
         """Parse Crossref item into CrossrefArticle."""
         try:
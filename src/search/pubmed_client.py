@@ -1,14 +1,43 @@
 """PubMed/NCBI Entrez search client."""
 
-import time
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from dataclasses import asdict, dataclass
 from Bio import Entrez
 import requests
 from src.common.logging import get_logger
+from src.search.cache import DEFAULT_EXPIRE_AFTER, ResponseCache
+from src.search.rate_limit import RateLimiter
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
 
 logger = get_logger(__name__)
 
+# PMIDs per efetch request (NCBI's recommended maximum for one call)
+EFETCH_BATCH_SIZE = 200
+
+
+def _element_text(elem: Any) -> str:
+    """
+    Text of an element with inline markup (<i>, <sup>, ...) kept as tags,
+    matching what Bio.Entrez.read returns: entities are decoded everywhere
+    (``&lt;`` becomes ``<``), only the tags themselves are reproduced.
+    """
+    if elem is None:
+        return ""
+    parts = [elem.text or ""]
+    for child in elem:
+        if isinstance(child.tag, str):  # skip comments / processing instructions
+            attrs = "".join(f' {name}="{value}"' for name, value in child.attrib.items())
+            parts.append(f"<{child.tag}{attrs}>{_element_text(child)}</{child.tag}>")
+        parts.append(child.tail or "")
+    return "".join(parts)
+
 
 @dataclass
 class PubMedArticle:
@@ -38,6 +67,10 @@ class PubMedClient:
         email: str,
         api_key: Optional[str] = None,
         tool_name: str = "tervyx-evidence",
+        cache_dir: Optional[Path | str] = None,
+        cache_expire_after: Optional[float] = DEFAULT_EXPIRE_AFTER,
+        rate_limit: Optional[float] = None,
+        refresh_cache: bool = False,
     ):
         """
         Initialize PubMed client.
@@ -46,6 +79,10 @@ class PubMedClient:
             email: Required by NCBI
             api_key: Optional API key for higher rate limits
             tool_name: Tool identifier for NCBI
+            cache_dir: Persist search results and articles here (None = in-memory only)
+            cache_expire_after: Seconds before cached responses go stale (None = never)
+            rate_limit: Requests per second (default: NCBI limit, 10 with key / 3 without)
+            refresh_cache: Re-download instead of reading cached responses (still writes them)
         """
         self.email = email
         self.api_key = api_key
@@ -56,16 +93,22 @@ class PubMedClient:
         if api_key:
             Entrez.api_key = api_key
 
-        self.rate_limit = 10 if api_key else 3
-        self.last_request_time = 0
+        self.rate_limit = rate_limit or (10 if api_key else 3)
+        self._rate_limiter = RateLimiter(self.rate_limit)
+
+        # Cache hits skip both the network and _throttle()
+        self._search_cache = ResponseCache(
+            "pubmed_search", cache_dir, cache_expire_after, refresh=refresh_cache
+        )
+        self._article_cache = ResponseCache(
+            "pubmed_article", cache_dir, cache_expire_after, refresh=refresh_cache
+        )
+        # Parsed articles for this client's lifetime (shared objects; treat as read-only)
+        self._parsed_articles: Dict[str, PubMedArticle] = {}
 
     def _throttle(self):
-        """Respect rate limits."""
-        elapsed = time.time() - self.last_request_time
-        min_interval = 1.0 / self.rate_limit
-        if elapsed < min_interval:
-            time.sleep(min_interval - elapsed)
-        self.last_request_time = time.time()
+        """Respect rate limits (shared by all threads using this client)."""
+        self._rate_limiter.acquire()
 
     def search(
         self,
@@ -84,8 +127,43 @@ class PubMedClient:
         Returns:
             List of PMIDs
         """
+        cached = self._cached_search(query, max_results, filters)
+        if cached is not None:
+            return cached
+
         self._throttle()
+        return self._esearch(query, max_results, filters)
 
+    async def search_async(
+        self,
+        query: str,
+        max_results: int = 100,
+        filters: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Async variant of search().
+
+        Waits for the rate limiter with asyncio.sleep and runs the blocking
+        Entrez call in a worker thread, so the event loop stays free.
+        """
+        cached = self._cached_search(query, max_results, filters)
+        if cached is not None:
+            return cached
+
+        await self._rate_limiter.acquire_async()
+        return await asyncio.to_thread(self._esearch, query, max_results, filters)
+
+    def _cached_search(
+        self, query: str, max_results: int, filters: Optional[List[str]]
+    ) -> Optional[List[str]]:
+        cached = self._search_cache.get((query, max_results, list(filters or ())))
+        if cached is None:
+            return None
+        logger.info(f"PubMed search (cached): {query} → {len(cached)} PMIDs")
+        return list(cached)
+
+    def _esearch(self, query: str, max_results: int, filters: Optional[List[str]]) -> List[str]:
+        """Run (and cache) one esearch request; the caller handles rate limiting."""
         # Build full query with filters
         full_query = query
         if filters:
@@ -103,8 +181,9 @@ class PubMedClient:
             record = Entrez.read(handle)
             handle.close()
 
-            pmids = record.get("IdList", [])
+            pmids = [str(pmid) for pmid in record.get("IdList", [])]
             logger.info(f"Found {len(pmids)} PMIDs")
+            self._search_cache.set((query, max_results, list(filters or ())), pmids)
             return pmids
 
         except Exception as e:
@@ -124,35 +203,195 @@ class PubMedClient:
         if not pmids:
             return []
 
-        self._throttle()
-
+        by_pmid, batches = self._plan_fetch(pmids)
         articles = []
-        batch_size = 100
+        if batches:
+            # Batches overlap network and parsing under the shared rate limit;
+            # map() keeps the results in batch order
+            max_workers = max(1, min(int(self.rate_limit), len(batches)))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                articles = [
+                    article
+                    for batch in executor.map(self._fetch_batch, batches)
+                    for article in batch
+                ]
+
+        return self._merge_fetched(pmids, by_pmid, articles)
+
+    async def fetch_details_async(self, pmids: List[str]) -> List[PubMedArticle]:
+        """
+        Async variant of fetch_details().
 
-        for i in range(0, len(pmids), batch_size):
-            batch = pmids[i : i + batch_size]
-            logger.info(f"Fetching details for {len(batch)} PMIDs...")
+        All batches are in flight at once, each waiting for its rate-limit
+        slot with asyncio.sleep rather than blocking a thread.
+        """
+        if not pmids:
+            return []
 
-            try:
-                handle = Entrez.efetch(
-                    db="pubmed",
-                    id=",".join(batch),
-                    retmode="xml",
-                )
-                records = Entrez.read(handle)
-                handle.close()
+        by_pmid, batches = self._plan_fetch(pmids)
+
+        async def fetch(batch: List[str]) -> List[PubMedArticle]:
+            await self._rate_limiter.acquire_async()
+            return await asyncio.to_thread(self._efetch, batch)
+
+        fetched = await asyncio.gather(*(fetch(batch) for batch in batches))
+        articles = [article for batch in fetched for article in batch]
+
+        return self._merge_fetched(pmids, by_pmid, articles)
+
+    def _plan_fetch(self, pmids: List[str]) -> Tuple[Dict[str, PubMedArticle], List[List[str]]]:
+        """
+        Split PMIDs into cached articles and efetch batches of the rest.
+
+        Duplicate PMIDs are dropped (first occurrence wins). Lookups go
+        through the parsed-article dict, then the response cache, so a PMID
+        is fetched and parsed at most once per run.
+        """
+        by_pmid: Dict[str, PubMedArticle] = {}
+        missing = []
+        for pmid in dict.fromkeys(pmids):
+            article = self._parsed_articles.get(pmid) or self._cached_article(pmid)
+            if article is None:
+                missing.append(pmid)
+            else:
+                by_pmid[pmid] = article
+
+        batch_size = EFETCH_BATCH_SIZE
+        batches = [missing[i : i + batch_size] for i in range(0, len(missing), batch_size)]
+        return by_pmid, batches
+
+    def _cached_article(self, pmid: str) -> Optional[PubMedArticle]:
+        """Article from the response cache, or None (entries from an older schema are misses)."""
+        cached = self._article_cache.get(pmid)
+        if cached is None:
+            return None
+        try:
+            article = PubMedArticle(**cached)
+        except TypeError:
+            return None
+        self._parsed_articles[pmid] = article
+        return article
+
+    def _merge_fetched(
+        self,
+        pmids: List[str],
+        by_pmid: Dict[str, PubMedArticle],
+        articles: List[PubMedArticle],
+    ) -> List[PubMedArticle]:
+        n_cached = len(by_pmid)
+        if by_pmid:
+            # Merge cache hits back in, keeping the caller's PMID order
+            by_pmid.update((article.pmid, article) for article in articles)
+            articles = [by_pmid[pmid] for pmid in dict.fromkeys(pmids) if pmid in by_pmid]
+
+        logger.info(f"Parsed {len(articles)} articles ({n_cached} cached)")
+        return articles
+
+    def _fetch_batch(self, batch: List[str]) -> List[PubMedArticle]:
+        """Fetch, parse and cache one efetch batch of PMIDs."""
+        self._throttle()
+        return self._efetch(batch)
 
-                for record in records["PubmedArticle"]:
-                    article = self._parse_article(record)
+    def _efetch(self, batch: List[str]) -> List[PubMedArticle]:
+        """Run one efetch request and parse/cache its articles; the caller handles rate limiting."""
+        logger.info(f"Fetching details for {len(batch)} PMIDs...")
+
+        articles = []
+        try:
+            handle = Entrez.efetch(
+                db="pubmed",
+                id=",".join(batch),
+                retmode="xml",
+            )
+            try:
+                for article in self._iter_articles(handle):
                     if article:
                         articles.append(article)
+                        self._parsed_articles[article.pmid] = article
+                        self._article_cache.set(article.pmid, asdict(article))
+            finally:
+                handle.close()
 
-            except Exception as e:
-                logger.error(f"Failed to fetch batch: {e}")
+        except Exception as e:
+            logger.error(f"Failed to fetch batch: {e}")
 
-        logger.info(f"Parsed {len(articles)} articles")
         return articles
 
+    def _iter_articles(self, handle) -> Iterator[Optional[PubMedArticle]]:
+        """
+        Parse an efetch XML response one PubmedArticle at a time.
+
+        With lxml, records are stream-parsed straight into PubMedArticle and
+        freed as soon as they are read, so only one record is in memory at a
+        time. Without it, falls back to Bio.Entrez.read.
+        """
+        if etree is None:
+            for record in Entrez.read(handle)["PubmedArticle"]:
+                yield self._parse_article(record)
+            return
+
+        for _, elem in etree.iterparse(handle, events=("end",), tag="PubmedArticle"):
+            yield self._parse_element(elem)
+            elem.clear()
+            elem.getparent().remove(elem)
+
+    def _parse_element(self, elem: Any) -> Optional[PubMedArticle]:
+        """Parse a PubmedArticle lxml element into PubMedArticle."""
+        try:
+            medline = elem.find("MedlineCitation")
+            article = medline.find("Article")
+
+            pmid = medline.findtext("PMID")
+            if pmid is None:
+                raise ValueError("record has no PMID")
+
+            # DOI / PMC ID (the last listed ID of each type wins)
+            doi = None
+            pmc_id = None
+            for article_id in elem.iterfind("PubmedData/ArticleIdList/ArticleId"):
+                id_type = article_id.get("IdType")
+                if id_type == "doi":
+                    doi = _element_text(article_id)
+                elif id_type == "pmc":
+                    pmc_id = _element_text(article_id)
+
+            # Title
+            title = _element_text(article.find("ArticleTitle"))
+
+            # Abstract
+            abstract = " ".join(
+                _element_text(part) for part in article.iterfind("Abstract/AbstractText")
+            )
+
+            # Journal
+            journal = article.findtext("Journal/Title", "")
+
+            # Year
+            year = int(article.findtext("Journal/JournalIssue/PubDate/Year", 0))
+
+            # Authors
+            authors = []
+            for author in article.iterfind("AuthorList/Author"):
+                last_name = author.findtext("LastName", "")
+                initials = author.findtext("Initials", "")
+                if last_name:
+                    authors.append(f"{last_name} {initials}".strip())
+
+            return PubMedArticle(
+                pmid=pmid,
+                doi=doi,
+                title=title,
+                abstract=abstract,
+                journal=journal,
+                year=year,
+                authors=authors,
+                pmc_id=pmc_id,
+            )
+
+        except Exception as e:
+            logger.error(f"Failed to parse article: {e}")
+            return None
+
     def _parse_article(self, record: Dict) -> Optional[PubMedArticle]:
         """Parse PubMed XML record into PubMedArticle."""
         try:
@@ -232,3 +471,13 @@ class PubMedClient:
         """
         pmids = self.search(query, max_results, filters)
         return self.fetch_details(pmids)
+
+    async def search_and_fetch_async(
+        self,
+        query: str,
+        max_results: int = 100,
+        filters: Optional[List[str]] = None,
+    ) -> List[PubMedArticle]:
+        """Async variant of search_and_fetch()."""
+        pmids = await self.search_async(query, max_results, filters)
+        return await self.fetch_details_async(pmids)
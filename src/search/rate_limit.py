@@ -0,0 +1,131 @@
+"""Thread-safe request rate limiting for the search and LLM clients."""
+
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """
+    Spaces calls at least ``period / rate`` seconds apart across all threads.
+
+    Each acquire() reserves the next free slot under a lock and then sleeps
+    outside it, so concurrent workers queue up behind the shared budget
+    instead of serializing on the lock. acquire_async() draws on the same
+    budget from coroutines, so sync and async callers share one cap.
+    """
+
+    def __init__(self, rate: float, period: float = 1.0):
+        """
+        Initialize limiter.
+
+        Args:
+            rate: Maximum calls per period
+            period: Period length in seconds
+        """
+        self.rate = rate
+        self.interval = period / rate
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Claim the next free slot and return how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        return slot - now
+
+    def acquire(self) -> None:
+        """Block until the caller may issue its request."""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """Wait for the next slot without blocking the event loop."""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class TokenBucket:
+    """
+    Requests-per-minute and tokens-per-minute quota shared across threads.
+
+    Both budgets refill continuously up to one period's worth. acquire()
+    debits a request and its estimated tokens up front and sleeps until the
+    debt is covered, so callers queue behind each other's reservations;
+    reconcile() corrects the token balance once the real usage is known.
+    Either limit may be None (unlimited).
+    """
+
+    def __init__(
+        self,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        period: float = 60.0,
+    ):
+        """
+        Initialize bucket (both budgets start full).
+
+        Args:
+            rpm: Maximum requests per period
+            tpm: Maximum tokens per period
+            period: Period length in seconds
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self.period = period
+        self._requests = float(rpm or 0)
+        self._tokens = float(tpm or 0)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / self.period)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / self.period)
+
+    def _reserve(self, tokens: int) -> float:
+        """Debit one request and ``tokens``; return how long until the debt is repaid."""
+        delay = 0.0
+        with self._lock:
+            self._refill()
+            if self.rpm:
+                self._requests -= 1
+                delay = max(delay, -self._requests * self.period / self.rpm)
+            if self.tpm:
+                # A single oversized request waits at most one period
+                self._tokens -= min(tokens, self.tpm)
+                delay = max(delay, -self._tokens * self.period / self.tpm)
+        return delay
+
+    def acquire(self, tokens: int = 0) -> None:
+        """
+        Block until the caller may send a request of about ``tokens`` tokens.
+
+        Args:
+            tokens: Estimated tokens the request will consume
+        """
+        delay = self._reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    def reconcile(self, estimated: int, actual: Optional[int]) -> None:
+        """
+        Charge (or refund) the difference between estimated and reported usage.
+
+        Args:
+            estimated: Tokens passed to acquire()
+            actual: Tokens the API reported (None = unknown, keep the estimate)
+        """
+        if not self.tpm or actual is None:
+            return
+        with self._lock:
+            self._tokens -= actual - min(estimated, self.tpm)
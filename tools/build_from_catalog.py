@@ -9,18 +9,167 @@ Usage:
         --max-per-entry 5
 """
 
+import os
 import sys
 import argparse
+import asyncio
+import logging
+import multiprocessing
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack, closing
+from functools import partial
 from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.catalog.catalog_loader import CatalogLoader
+from src.catalog.catalog_loader import EntryDefinition, load_catalog
+from src.common.io_utils import load_json
 from src.common.logging import setup_logger
+from src.matching.relevance_matcher import PaperIndex, RelevanceMatcher
+from src.search.pubmed_client import PubMedArticle, PubMedClient
+from tools.generate_evidence import (
+    RCT_FILTERS,
+    RunConfig,
+    add_cache_arguments,
+    compute_build_key,
+    config_digest,
+    process_entry,
+)
+
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
 
 logger = setup_logger("build_from_catalog")
 
+# Recycle workers periodically so long builds don't accumulate memory
+MAX_TASKS_PER_WORKER = 4
+# Workers fork so they inherit the parent's imported modules (pandas, numpy, src.*)
+# instead of re-importing them; other platforms keep their default start method
+MP_CONTEXT = multiprocessing.get_context("fork" if sys.platform.startswith("linux") else None)
+# Per-entry script used by --isolated
+GENERATE_EVIDENCE = Path(__file__).with_name("generate_evidence.py")
+
+# Relevance index shared by the tasks of one worker (set by the Pool initializer)
+_paper_index: Optional[PaperIndex] = None
+
+
+def _init_worker(paper_index: Optional[PaperIndex], quiet: bool) -> None:
+    global _paper_index
+    _paper_index = paper_index
+    if quiet:
+        # Per-step pipeline logs from every worker would interleave on stdout;
+        # warnings and errors still come through
+        logging.getLogger("generate_evidence").setLevel(logging.WARNING)
+
+
+async def _prefetch_papers(
+    entries: List[EntryDefinition], cfg: RunConfig
+) -> Dict[str, Tuple[List[PubMedArticle], bool]]:
+    """
+    Search PubMed for every entry, then efetch the union of their PMIDs.
+
+    PMIDs shared between entries are fetched once, and the fetch is packed
+    into full-size efetch batches instead of one partial batch per entry.
+
+    Args:
+        entries: Entries to search for
+        cfg: Pipeline settings
+
+    Returns:
+        Dict of entry ID -> (candidate papers in search result order, whether
+        every PMID the entry's search returned was fetched)
+    """
+    pubmed = PubMedClient(
+        email=cfg.email,
+        api_key=cfg.ncbi_api_key,
+        cache_dir=cfg.cache_dir,
+        refresh_cache=cfg.refresh_cache,
+    )
+    pmid_lists = await asyncio.gather(
+        *(pubmed.search_async(e.search_query, cfg.max_papers, RCT_FILTERS) for e in entries)
+    )
+
+    all_pmids = [pmid for pmids in pmid_lists for pmid in pmids]
+    by_pmid = {paper.pmid: paper for paper in await pubmed.fetch_details_async(all_pmids)}
+    logger.info(f"Prefetched {len(by_pmid)} papers for {len(entries)} entries")
+
+    return {
+        entry.id: (
+            [by_pmid[pmid] for pmid in pmids if pmid in by_pmid],
+            all(pmid in by_pmid for pmid in pmids),
+        )
+        for entry, pmids in zip(entries, pmid_lists)
+    }
+
+
+def _is_up_to_date(entry: EntryDefinition, output_root: Path, digest: str) -> bool:
+    """True if the entry's metadata.json was written by a build with the same key."""
+    metadata_path = entry.get_output_path(output_root) / "metadata.json"
+    try:
+        metadata = load_json(metadata_path)
+    except (OSError, ValueError):
+        return False
+    return isinstance(metadata, dict) and metadata.get("build_key") == compute_build_key(
+        entry, digest
+    )
+
+
+def _run_one(
+    payload: Tuple[Dict[str, Any], List[PubMedArticle], bool], cfg: RunConfig
+) -> Tuple[str, int]:
+    """Pool worker: run one (already loaded) entry, reporting crashes as a failing exit code."""
+    entry_data, papers, papers_complete = payload
+    entry = EntryDefinition.from_dict(entry_data)
+    try:
+        return entry.id, process_entry(entry, cfg, papers, _paper_index, papers_complete)
+    except Exception as e:
+        logger.exception(f"{entry.id} raised {type(e).__name__}: {e}")
+        return entry.id, 1
+
+
+def _run_subprocess(entry_id: str, cfg: RunConfig) -> int:
+    """Run generate_evidence.py for one entry and return its exit code."""
+    cmd = [
+        sys.executable,
+        str(GENERATE_EVIDENCE),
+        "--entry-id",
+        entry_id,
+        "--catalog",
+        cfg.catalog,
+        "--output",
+        cfg.output,
+        "--csv-engine",
+        cfg.csv_engine,
+    ]
+    cmd += ["--cache-dir", cfg.cache_dir] if cfg.cache_dir is not None else ["--no-cache"]
+    return subprocess.run(cmd).returncode
+
+
+def _run_isolated(
+    entries: List[EntryDefinition], cfg: RunConfig, workers: int
+) -> Iterator[Tuple[str, int]]:
+    """
+    Run each entry in its own process, up to `workers` at a time.
+
+    Each child is waited on by a thread blocked in waitpid(), so a result is
+    yielded the moment any child exits (no polling). Closing the iterator
+    cancels children that have not started yet.
+
+    Yields:
+        (entry ID, exit code) in completion order
+    """
+    executor = ThreadPoolExecutor(max_workers=workers)
+    futures = {executor.submit(_run_subprocess, entry.id, cfg): entry.id for entry in entries}
+    try:
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
 
 def main():
     parser = argparse.ArgumentParser(description="Build evidence for all catalog entries")
@@ -50,12 +199,40 @@ def main():
         nargs="*",
         help="Process only specific entry IDs (optional)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Entries processed in parallel (default: CPU count)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild entries even if their outputs are up to date",
+    )
+    parser.add_argument(
+        "--isolated",
+        action="store_true",
+        help="Run each entry in its own generate_evidence.py process",
+    )
+    parser.add_argument(
+        "--csv-engine",
+        choices=["pandas", "pyarrow"],
+        default=RunConfig.csv_engine,
+        help="Writer for evidence.csv (pyarrow is faster but not byte-identical)",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Log every pipeline step of every entry (default: warnings and per-entry results)",
+    )
+    add_cache_arguments(parser)
 
     args = parser.parse_args()
 
     # Load catalog
     logger.info(f"Loading catalog: {args.catalog}")
-    catalog = CatalogLoader(args.catalog)
+    catalog = load_catalog(args.catalog)
 
     entries_to_process = catalog.get_all_entries()
 
@@ -66,35 +243,84 @@ def main():
     else:
         logger.info(f"Processing all {len(entries_to_process)} entries")
 
-    # Process each entry
+    cfg = RunConfig(
+        catalog=args.catalog,
+        output=args.output,
+        cache_dir=args.cache_dir,
+        refresh_cache=args.refresh_cache,
+        csv_engine=args.csv_engine,
+    )
+    n_total = len(entries_to_process)
+
+    # Skip entries whose outputs were built from identical inputs
+    if not args.force:
+        digest = config_digest(cfg)
+        output_root = Path(cfg.output)
+        entries_to_process = [
+            e for e in entries_to_process if not _is_up_to_date(e, output_root, digest)
+        ]
+    skipped_count = n_total - len(entries_to_process)
+    if skipped_count:
+        logger.info(f"Skipping {skipped_count} up-to-date entries (use --force to rebuild)")
+
+    workers = max(1, min(args.workers, len(entries_to_process)))
+    n_entries = len(entries_to_process)
     success_count = 0
     failure_count = 0
 
-    for i, entry in enumerate(entries_to_process, 1):
-        logger.info(f"\n[{i}/{len(entries_to_process)}] Processing: {entry.id}")
-
-        # Call generate_evidence.py as subprocess
-        cmd = [
-            sys.executable,
-            "tools/generate_evidence.py",
-            "--entry-id",
-            entry.id,
-            "--catalog",
-            args.catalog,
-            "--output",
-            args.output,
-        ]
+    with ExitStack() as stack:
+        if args.isolated:
+            # Children run Step 3 themselves; prefetching first means they all
+            # hit the shared disk cache instead of NCBI
+            if cfg.cache_dir is not None:
+                asyncio.run(_prefetch_papers(entries_to_process, cfg))
+            logger.info(f"Using {workers} isolated subprocesses")
+            results = stack.enter_context(closing(_run_isolated(entries_to_process, cfg, workers)))
+        else:
+            # Search all entries up front and fetch their papers in shared batches
+            papers_by_entry = asyncio.run(_prefetch_papers(entries_to_process, cfg))
+
+            # Workers get the parsed entries and their papers, so the catalog is loaded
+            # once per build and workers don't touch PubMed
+            payloads = [
+                (entry.to_dict(), *papers_by_entry[entry.id]) for entry in entries_to_process
+            ]
+
+            # Keyword searches for relevance matching run once over all fetched papers
+            unique_papers = {p.pmid: p for papers, _ in papers_by_entry.values() for p in papers}
+            paper_index = RelevanceMatcher(cfg.relevance_threshold).build_index(
+                list(unique_papers.values()), entries_to_process
+            )
+
+            # Process entries in a worker pool (one pipeline run per task, no re-import per entry)
+            logger.info(f"Using {workers} worker processes")
+            pool = stack.enter_context(
+                MP_CONTEXT.Pool(
+                    processes=workers,
+                    initializer=_init_worker,
+                    initargs=(paper_index, not args.verbose),
+                    maxtasksperchild=MAX_TASKS_PER_WORKER,
+                )
+            )
+            results = pool.imap_unordered(partial(_run_one, cfg=cfg), payloads)
+
+        # With a progress bar, per-entry success lines are only logged with --verbose
+        show_progress = tqdm is not None and not args.verbose
+        if show_progress:
+            results = tqdm(results, total=n_entries, desc="entries", unit="entry")
+        log_success = logger.debug if show_progress else logger.info
 
-        try:
-            result = subprocess.run(cmd, check=True, capture_output=False)
-            success_count += 1
-            logger.info(f"✓ {entry.id} completed")
+        for i, (entry_id, returncode) in enumerate(results, 1):
+            if returncode == 0:
+                success_count += 1
+                log_success(f"[{i}/{n_entries}] ✓ {entry_id} completed")
+                continue
 
-        except subprocess.CalledProcessError as e:
             failure_count += 1
-            logger.error(f"✗ {entry.id} failed with code {e.returncode}")
+            logger.error(f"[{i}/{n_entries}] ✗ {entry_id} failed with code {returncode}")
 
             if args.fail_fast:
+                # Leaving the with-block stops the remaining work
                 logger.error("Fail-fast enabled, stopping")
                 return 1
 
@@ -102,7 +328,8 @@ def main():
     logger.info("\n" + "=" * 60)
     logger.info("BUILD SUMMARY")
     logger.info("=" * 60)
-    logger.info(f"Total entries: {len(entries_to_process)}")
+    logger.info(f"Total entries: {n_total}")
+    logger.info(f"Skipped (up to date): {skipped_count}")
     logger.info(f"Success: {success_count}")
     logger.info(f"Failures: {failure_count}")
     logger.info(f"Output: {args.output}")
@@ -11,89 +11,232 @@ Usage:
 
 import sys
 import argparse
+import asyncio
+from dataclasses import dataclass, field, fields
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import takewhile
+from operator import attrgetter
+from typing import List, Optional
+import numpy as np
 import pandas as pd
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.catalog.catalog_loader import CatalogLoader
+from src.catalog.catalog_loader import EntryDefinition, load_catalog
 from src.gates_precheck.phi_precheck import PhiPrecheck
 from src.gates_precheck.k_precheck import KPrecheck
-from src.search.pubmed_client import PubMedClient
-from src.matching.relevance_matcher import RelevanceMatcher
+from src.search.pubmed_client import PubMedArticle, PubMedClient
+from src.matching.relevance_matcher import PaperIndex, RelevanceMatcher
 from src.extraction.llm_extract import LLMExtractor
 from src.extraction.validators import EvidenceValidator
 from src.common.io_utils import save_json, save_evidence_csv, ensure_dir
-from src.common.hashing import compute_manifest_hashes
+from src.common.hashing import (
+    MANIFEST_CACHE_NAME,
+    compute_manifest_hashes,
+    sha256_dict,
+    sha256_file,
+    sha256_str,
+)
+from src import __version__
 from src.common.logging import setup_logger
 import os
 
 logger = setup_logger("generate_evidence")
 
+# Step 3 search filters (RCTs in humans, English)
+RCT_FILTERS = ["randomized controlled trial[pt]", "humans[MeSH Terms]", "english[Language]"]
+DEFAULT_CACHE_DIR = ".cache/pubmed"
+# Background threads for the Step 7 output files
+OUTPUT_WRITERS = 3
+
+
+@dataclass(frozen=True)
+class RunConfig:
+    """Pipeline settings shared by every entry (mirrors the CLI flags)."""
+
+    catalog: str = "config/entry_catalog.yaml"
+    output: str = "outputs/evidence_catalog"
+    phi_config: str = "config/phi_precheck.yaml"
+    k_config: str = "config/k_precheck.yaml"
+    email: str = field(default_factory=lambda: os.getenv("TERVYX_EMAIL", "research@example.com"))
+    ncbi_api_key: Optional[str] = field(default_factory=lambda: os.getenv("NCBI_API_KEY"))
+    max_papers: int = 50
+    relevance_threshold: float = 0.7
+    # PubMed responses are cached here across runs (None = no disk cache)
+    cache_dir: Optional[str] = DEFAULT_CACHE_DIR
+    refresh_cache: bool = False
+    # evidence.csv writer; see save_evidence_csv (pyarrow output differs byte-wise)
+    csv_engine: str = "pandas"
+
+
+def add_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the PubMed cache flags (shared with build_from_catalog)."""
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help="Directory for cached PubMed responses",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="cache_dir",
+        action="store_const",
+        const=None,
+        help="Do not read or write the PubMed disk cache",
+    )
+    parser.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        help="Re-download PubMed responses and overwrite cached ones",
+    )
+
+
+def config_digest(cfg: RunConfig) -> str:
+    """
+    Digest of the run-wide inputs that shape every entry's outputs.
+
+    Covers the Φ/K gate configs (by content), the search/matching settings
+    and the pipeline version; hash it once per build and reuse it.
+    """
+    return sha256_dict(
+        {
+            "phi_config": sha256_file(cfg.phi_config),
+            "k_config": sha256_file(cfg.k_config),
+            "max_papers": cfg.max_papers,
+            "relevance_threshold": cfg.relevance_threshold,
+            "csv_engine": cfg.csv_engine,
+            "version": __version__,
+        }
+    )
+
+
+def compute_build_key(entry: EntryDefinition, digest: str) -> str:
+    """
+    Content key recorded in metadata.json; equal keys mean the outputs are up to date.
+
+    Args:
+        entry: Catalog entry
+        digest: config_digest() of the run settings
+
+    Returns:
+        SHA256 hex digest
+    """
+    return sha256_dict({"entry": entry.to_dict(), "config": digest})
+
 
 def main():
+    defaults = RunConfig()
     parser = argparse.ArgumentParser(description="Generate evidence for single entry")
     parser.add_argument("--entry-id", required=True, help="Entry ID from catalog")
     parser.add_argument(
         "--catalog",
-        default="config/entry_catalog.yaml",
+        default=defaults.catalog,
         help="Path to entry catalog",
     )
     parser.add_argument(
         "--output",
-        default="outputs/evidence_catalog",
+        default=defaults.output,
         help="Output directory",
     )
     parser.add_argument(
         "--phi-config",
-        default="config/phi_precheck.yaml",
+        default=defaults.phi_config,
         help="Φ-gate config",
     )
     parser.add_argument(
         "--k-config",
-        default="config/k_precheck.yaml",
+        default=defaults.k_config,
         help="K-gate config",
     )
     parser.add_argument(
         "--email",
-        default=os.getenv("TERVYX_EMAIL", "research@example.com"),
+        default=defaults.email,
         help="Email for PubMed API",
     )
     parser.add_argument(
         "--ncbi-api-key",
-        default=os.getenv("NCBI_API_KEY"),
+        default=defaults.ncbi_api_key,
         help="NCBI API key (optional)",
     )
     parser.add_argument(
         "--max-papers",
         type=int,
-        default=50,
+        default=defaults.max_papers,
         help="Max papers to search",
     )
     parser.add_argument(
         "--relevance-threshold",
         type=float,
-        default=0.7,
+        default=defaults.relevance_threshold,
         help="Relevance matching threshold",
     )
+    parser.add_argument(
+        "--csv-engine",
+        choices=["pandas", "pyarrow"],
+        default=defaults.csv_engine,
+        help="Writer for evidence.csv (pyarrow is faster but not byte-identical)",
+    )
+    add_cache_arguments(parser)
 
     args = parser.parse_args()
+    cfg = RunConfig(
+        **{f.name: getattr(args, f.name) for f in fields(RunConfig) if hasattr(args, f.name)}
+    )
+
+    return run_entry(args.entry_id, cfg)
+
+
+def run_entry(entry_id: str, cfg: RunConfig) -> int:
+    """
+    Look up an entry in cfg.catalog and run the pipeline for it.
 
-    # Load catalog
-    logger.info(f"Loading catalog: {args.catalog}")
-    catalog = CatalogLoader(args.catalog)
-    entry = catalog.get_entry_by_id(args.entry_id)
+    Args:
+        entry_id: Entry ID from catalog
+        cfg: Pipeline settings
+
+    Returns:
+        Exit code (0 = success or nothing to extract, 1 = rejected/failed)
+    """
+    # Load catalog (parsed once per process while the file is unchanged)
+    logger.info(f"Loading catalog: {cfg.catalog}")
+    catalog = load_catalog(cfg.catalog)
+    entry = catalog.get_entry_by_id(entry_id)
 
     if not entry:
-        logger.error(f"Entry not found: {args.entry_id}")
+        logger.error(f"Entry not found: {entry_id}")
         return 1
 
+    return process_entry(entry, cfg)
+
+
+def process_entry(
+    entry: EntryDefinition,
+    cfg: RunConfig,
+    papers: Optional[List[PubMedArticle]] = None,
+    paper_index: Optional[PaperIndex] = None,
+    papers_complete: bool = True,
+) -> int:
+    """
+    Run the full pipeline (prechecks → search → match → extract → save) for one entry.
+
+    Args:
+        entry: Catalog entry
+        cfg: Pipeline settings
+        papers: Candidate papers already fetched for this entry (None = search in Step 3)
+        paper_index: Shared relevance index covering papers (see RelevanceMatcher.build_index)
+        papers_complete: False if some PMIDs the entry's search returned were not
+            fetched; the outputs are then written without a build key, so the
+            next catalog build redoes the entry
+
+    Returns:
+        Exit code (0 = success or nothing to extract, 1 = rejected/failed)
+    """
     logger.info(f"Processing entry: {entry.id} ({entry.claim_text})")
 
     # Output directory
-    output_dir = entry.get_output_path(Path(args.output))
+    output_dir = entry.get_output_path(Path(cfg.output))
     ensure_dir(output_dir)
     logger.info(f"Output directory: {output_dir}")
 
@@ -101,7 +244,7 @@ def main():
     # STEP 1: Φ-Gate Pre-check
     # ========================================================================
     logger.info("Step 1: Φ-Gate pre-check...")
-    phi_checker = PhiPrecheck(args.phi_config)
+    phi_checker = PhiPrecheck.shared(cfg.phi_config)
     phi_result = phi_checker.check_entry(
         entry.intervention_type,
         entry.product,
@@ -127,7 +270,7 @@ def main():
     # STEP 2: K-Gate Pre-check
     # ========================================================================
     logger.info("Step 2: K-Gate pre-check...")
-    k_checker = KPrecheck(args.k_config)
+    k_checker = KPrecheck.shared(cfg.k_config)
     k_result = k_checker.check_entry(entry.product)
 
     if k_result.verdict == "reject":
@@ -147,21 +290,24 @@ def main():
     # ========================================================================
     # STEP 3: Search PubMed
     # ========================================================================
-    logger.info("Step 3: Searching PubMed...")
-    pubmed = PubMedClient(
-        email=args.email,
-        api_key=args.ncbi_api_key,
-    )
+    if papers is not None:
+        logger.info("Step 3: Using prefetched PubMed results")
+    else:
+        logger.info("Step 3: Searching PubMed...")
+        pubmed = PubMedClient(
+            email=cfg.email,
+            api_key=cfg.ncbi_api_key,
+            cache_dir=cfg.cache_dir,
+            refresh_cache=cfg.refresh_cache,
+        )
 
-    # Search with RCT filter
-    filters = ["randomized controlled trial[pt]", "humans[MeSH Terms]", "english[Language]"]
-    papers = pubmed.search_and_fetch(
-        query=entry.search_query,
-        max_results=args.max_papers,
-        filters=filters,
-    )
+        # Search with RCT filter; efetch batches overlap on the event loop
+        pmids = pubmed.search(entry.search_query, cfg.max_papers, RCT_FILTERS)
+        papers = asyncio.run(pubmed.fetch_details_async(pmids))
+        papers_complete = len(papers) == len(set(pmids))
 
     logger.info(f"Found {len(papers)} papers")
+    papers_by_pmid = {p.pmid: p for p in papers}
 
     if not papers:
         logger.warning("No papers found - cannot generate evidence")
@@ -178,11 +324,14 @@ def main():
     # STEP 4: Match papers to entry
     # ========================================================================
     logger.info("Step 4: Matching papers to entry...")
-    matcher = RelevanceMatcher(relevance_threshold=args.relevance_threshold)
-    match_results = matcher.match_papers(entry, papers)
-
-    matched_papers = [r for r in match_results if r.matched]
-    logger.info(f"Matched {len(matched_papers)} papers")
+    matcher = RelevanceMatcher(relevance_threshold=cfg.relevance_threshold)
+    # Only the top results Step 5 can use are ranked (at least one, to tell
+    # "no matches" apart); they stream in score order, so the matched ones are a prefix
+    match_stream = matcher.match_stream(
+        entry, papers, index=paper_index, limit=max(entry.max_studies, 1)
+    )
+    matched_papers = list(takewhile(attrgetter("matched"), match_stream))
+    logger.info(f"Selected {len(matched_papers)} matched papers (max {entry.max_studies})")
 
     if not matched_papers:
         logger.warning("No papers matched - cannot generate evidence")
@@ -190,7 +339,7 @@ def main():
             "entry_id": entry.id,
             "status": "no_matches",
             "n_candidates": len(papers),
-            "relevance_threshold": args.relevance_threshold,
+            "relevance_threshold": cfg.relevance_threshold,
             "timestamp": datetime.now().isoformat(),
         }
         save_json(metadata, output_dir / "metadata.json")
@@ -202,34 +351,33 @@ def main():
     logger.info("Step 5: Extracting evidence...")
     logger.warning("LLM extraction not implemented - generating MOCK data for demonstration")
 
-    # MOCK: Generate placeholder evidence.csv
-    records = []
-    for i, match in enumerate(matched_papers[: entry.max_studies]):
-        # Find corresponding paper
-        paper = next(p for p in papers if p.pmid == match.pmid)
-
-        # MOCK DATA - in real implementation, this would come from LLM extraction
-        records.append(
-            {
-                "study_id": f"{paper.authors[0].split()[0] if paper.authors else 'Unknown'}{paper.year}",
-                "year": paper.year,
-                "design": "randomized controlled trial",
-                "effect_type": entry.expected_effect_type,
-                "effect_point": -0.5 - (i * 0.1),  # MOCK
-                "ci_low": -0.8 - (i * 0.1),  # MOCK
-                "ci_high": -0.2 - (i * 0.1),  # MOCK
-                "n_treat": 30 + (i * 5),  # MOCK
-                "n_ctrl": 30 + (i * 5),  # MOCK
-                "risk_of_bias": "moderate",
-                "doi": paper.doi or f"10.MOCK/{paper.pmid}",
-                "journal_id": paper.journal[:20] if paper.journal else "Unknown",
-                "outcome_measure": entry.outcome,
-                "source_location": "Abstract (MOCK)",
-                "extraction_confidence": "low",  # MOCK data!
-            }
-        )
+    # MOCK: Generate placeholder evidence.csv (built column-wise)
+    selected = [papers_by_pmid[match.pmid] for match in matched_papers[: entry.max_studies]]
+    idx = np.arange(len(selected))
 
-    df = pd.DataFrame(records)
+    # MOCK DATA - in real implementation, this would come from LLM extraction
+    df = pd.DataFrame(
+        {
+            "study_id": [
+                f"{p.authors[0].split()[0] if p.authors else 'Unknown'}{p.year}" for p in selected
+            ],
+            "year": np.array([p.year for p in selected], dtype=np.int64),
+            "design": "randomized controlled trial",
+            "effect_type": entry.expected_effect_type,
+            "effect_point": -0.5 - (idx * 0.1),  # MOCK
+            "ci_low": -0.8 - (idx * 0.1),  # MOCK
+            "ci_high": -0.2 - (idx * 0.1),  # MOCK
+            "n_treat": 30 + (idx * 5),  # MOCK
+            "n_ctrl": 30 + (idx * 5),  # MOCK
+            "risk_of_bias": "moderate",
+            "doi": [p.doi or f"10.MOCK/{p.pmid}" for p in selected],
+            "journal_id": [p.journal[:20] if p.journal else "Unknown" for p in selected],
+            "outcome_measure": entry.outcome,
+            "source_location": "Abstract (MOCK)",
+            "extraction_confidence": "low",  # MOCK data!
+        },
+        copy=False,
+    )
 
     # ========================================================================
     # STEP 6: Validate
@@ -248,9 +396,15 @@ def main():
     # ========================================================================
     logger.info("Step 7: Saving outputs...")
 
+    # Independent files are written on background threads while the next one is
+    # built; the manifest hashes them, so it is written after they finish
+    writer = ThreadPoolExecutor(max_workers=OUTPUT_WRITERS)
+    writes = []
+
     # evidence.csv
-    save_evidence_csv(df, output_dir / "evidence.csv")
-    logger.info(f"Saved evidence.csv ({len(df)} records)")
+    writes.append(
+        writer.submit(save_evidence_csv, df, output_dir / "evidence.csv", engine=cfg.csv_engine)
+    )
 
     # metadata.json
     metadata = {
@@ -269,32 +423,47 @@ def main():
         "k_verdict": k_result.verdict,
         "k_safety_signals": k_result.safety_signals,
     }
-    save_json(metadata, output_dir / "metadata.json")
+    if papers_complete:
+        metadata["build_key"] = compute_build_key(entry, config_digest(cfg))
+    else:
+        # A failed efetch batch left the candidate set short: don't mark this
+        # build up to date, so a later run retries it
+        logger.warning("Some candidate papers could not be fetched; entry will be rebuilt")
+    writes.append(writer.submit(save_json, metadata, output_dir / "metadata.json"))
 
     # extraction_log.json (simplified)
     extraction_log = [
         {
-            "doi": rec["doi"],
-            "study_id": rec["study_id"],
+            "doi": doi,
+            "study_id": study_id,
             "verdict": "mock_extraction",
             "note": "MOCK data - real LLM extraction not implemented",
         }
-        for rec in records
+        for doi, study_id in zip(df["doi"], df["study_id"])
     ]
-    save_json(extraction_log, output_dir / "extraction_log.json")
-
-    # manifest.json
+    writes.append(writer.submit(save_json, extraction_log, output_dir / "extraction_log.json"))
+
+    writer.shutdown(wait=True)
+    for write in writes:
+        write.result()  # re-raise any write error
+
+    # manifest.json. The hash cache lives under --cache-dir, not in the entry
+    # directory, so exporters never publish it (one file per output directory)
+    manifest_cache = None
+    if cfg.cache_dir is not None:
+        cache_name = f"{sha256_str(str(output_dir.resolve()))[:16]}{MANIFEST_CACHE_NAME}"
+        manifest_cache = ensure_dir(Path(cfg.cache_dir) / "manifests") / cache_name
     manifest = {
-        "files": compute_manifest_hashes(output_dir),
+        "files": compute_manifest_hashes(output_dir, manifest_cache),
         "policy_anchor_hint": "A will compute policy_fingerprint later",
         "created": datetime.now().isoformat(),
     }
     save_json(manifest, output_dir / "manifest.json")
 
-    logger.info("✓ Evidence generation complete")
-    logger.info(f"  Output: {output_dir}")
-    logger.info(f"  Studies: {len(df)}")
-    logger.info("  NOTE: Evidence contains MOCK data - LLM extraction not implemented")
+    logger.info(
+        f"✓ Evidence generation complete: {len(df)} studies -> {output_dir} "
+        "(MOCK data - LLM extraction not implemented)"
+    )
 
     return 0
 
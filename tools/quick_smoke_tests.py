@@ -3,20 +3,24 @@
 Quick smoke tests for C repo structure and modules.
 
 Usage:
-    python tools/quick_smoke_tests.py
+    python tools/quick_smoke_tests.py [--jobs N]
 """
 
+import argparse
 import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+from typing import Callable, Tuple
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.catalog.catalog_loader import CatalogLoader
-from src.gates_precheck.phi_precheck import PhiPrecheck
-from src.gates_precheck.k_precheck import KPrecheck
-from src.common.io_utils import load_yaml, load_json
 from src.common.hashing import sha256_str
+from src.common.io_utils import load_json
 from src.common.logging import setup_logger
+from src.gates_precheck.k_precheck import KPrecheck
+from src.gates_precheck.phi_precheck import PhiPrecheck
 
 logger = setup_logger("smoke_tests")
 
@@ -67,6 +71,22 @@ def test_k_precheck():
     logger.info("  ✓ K-gate pre-check works")
 
 
+def test_k_precheck_empty_vocabulary():
+    """Test K-gate pre-check with a config that lists no keywords."""
+    logger.info("Test: K-gate pre-check (empty vocabulary)...")
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = Path(tmp) / "k_precheck.yaml"
+        config_path.write_text(
+            "high_risk_substances: []\nregulatory_warnings: []\ninteractions: []\n",
+            encoding="utf-8",
+        )
+        k = KPrecheck(str(config_path))
+        result = k.check_entry("magnesium-glycinate")
+    assert result.verdict == "pass", f"Unexpected verdict: {result.verdict}"
+
+    logger.info("  ✓ K-gate pre-check works with no keywords")
+
+
 def test_schema_validation():
     """Test ESV schema exists and is valid JSON."""
     logger.info("Test: ESV schema validation...")
@@ -94,31 +114,62 @@ def test_hashing():
     logger.info("  ✓ Hashing utilities work")
 
 
+TESTS = [
+    test_catalog_loading,
+    test_phi_precheck,
+    test_k_precheck,
+    test_k_precheck_empty_vocabulary,
+    test_schema_validation,
+    test_hashing,
+]
+
+
+def run_test(test: Callable[[], None]) -> Tuple[str, bool, str]:
+    """
+    Run one test, catching its failure.
+
+    Returns:
+        (test name, passed, error message)
+    """
+    try:
+        test()
+    except AssertionError as e:
+        return test.__name__, False, f"Test failed: {e}"
+    except Exception as e:
+        return test.__name__, False, f"Test error: {e}"
+    return test.__name__, True, ""
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Quick smoke tests")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Run tests in N worker processes (default: 1, in-process; "
+        "the tests take milliseconds, so process start-up dominates)",
+    )
+    args = parser.parse_args()
+
     logger.info("=" * 60)
     logger.info("TERVYX-EVIDENCE SMOKE TESTS")
     logger.info("=" * 60)
 
-    tests = [
-        test_catalog_loading,
-        test_phi_precheck,
-        test_k_precheck,
-        test_schema_validation,
-        test_hashing,
-    ]
-
     passed = 0
     failed = 0
 
-    for test in tests:
-        try:
-            test()
+    if args.jobs > 1:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(TESTS))) as executor:
+            futures = [executor.submit(run_test, test) for test in TESTS]
+            outcomes = [future.result() for future in as_completed(futures)]
+    else:
+        outcomes = map(run_test, TESTS)
+
+    for name, ok, error in outcomes:
+        if ok:
             passed += 1
-        except AssertionError as e:
-            logger.error(f"  ✗ Test failed: {e}")
-            failed += 1
-        except Exception as e:
-            logger.error(f"  ✗ Test error: {e}")
+        else:
+            logger.error(f"  ✗ {name}: {error}")
             failed += 1
 
     logger.info("=" * 60)
@@ -8,15 +8,19 @@ Usage:
     export TERVYX_EMAIL=your@email.com
 
     python tools/run_30_sample_extraction.py --limit 30
+    python tools/run_30_sample_extraction.py --limit 30 --dry-run  # no Gemini calls
 """
 
 import sys
 import os
-import json
-import time
+import csv
+import asyncio
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-import pandas as pd
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -25,14 +29,174 @@ load_dotenv()
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.search.pubmed_client import PubMedClient
-from src.extraction.gemini_client import GeminiExtractor
-from src.catalog.catalog_loader import CatalogLoader
+from src.search.pubmed_client import PubMedArticle, PubMedClient
+from src.extraction.gemini_client import ExtractionResult, GeminiExtractor, MAX_ABSTRACT_CHARS
+from src.catalog.catalog_loader import CatalogLoader, EntryDefinition
 from src.common.logging import setup_logger
-from src.common.io_utils import save_json, ensure_dir
+from src.common.io_utils import (
+    dumps_json_line,
+    loads_json,
+    save_json,
+    save_records_parquet,
+    ensure_dir,
+)
 
 logger = setup_logger("sample_extraction", level="INFO")
 
+# Gemini extractions are cached here across runs
+DEFAULT_CACHE_DIR = ".cache/gemini"
+
+# Model name recorded on --dry-run results
+DRY_RUN_MODEL = "dry-run"
+
+# Columns of the abstracts CSV (one per abstracts_index key)
+ABSTRACT_FIELDS = [
+    "study_id",
+    "pmid",
+    "doi",
+    "year",
+    "journal",
+    "title",
+    "abstract",
+    "authors",
+    "pmc_id",
+]
+
+
+class DryRunExtractor(GeminiExtractor):
+    """
+    GeminiExtractor stand-in for --dry-run: canned results, no API calls.
+
+    Prompt building, estimate_tokens() and the extract_stream() worker pool
+    are the real ones, so the run's non-LLM paths can be profiled at full
+    scale without spending tokens.
+    """
+
+    def __init__(self, max_abstract_chars: Optional[int] = MAX_ABSTRACT_CHARS):
+        """
+        Initialize fake extractor.
+
+        Args:
+            max_abstract_chars: Truncation cap, as for GeminiExtractor
+        """
+        self.model_name = DRY_RUN_MODEL
+        self.temperature = 0.0
+        self.max_abstract_chars = max_abstract_chars
+
+    def extract_from_abstract(
+        self,
+        abstract: str,
+        study_id: str,
+        doi: str,
+        year: int,
+        journal: str,
+    ) -> ExtractionResult:
+        """Return a fixed placeholder extraction (marked for manual review)."""
+        data = {
+            "study_id": study_id,
+            "doi": doi,
+            "outcome_context": {"measure_name": "dry-run measure"},
+            "effect": {"effect_type": "MD", "effect_point": 0.0, "ci_low": 0.0, "ci_high": 0.0},
+            "clinical_context": {"population": "dry-run population"},
+            "sample_sizes": {"n_treatment": 0, "n_control": 0, "n_total": 0},
+            "quality_flags": {
+                "extraction_confidence": "low",
+                "data_source": "abstract_only",
+                "needs_manual_review": True,
+                "review_reason": "dry run (no API call)",
+            },
+        }
+        return ExtractionResult(
+            success=True,
+            data=data,
+            model=DRY_RUN_MODEL,
+            tokens_used=self.estimate_tokens(abstract, study_id, doi, year, journal),
+        )
+
+
+async def _search_all(
+    pubmed: PubMedClient, entries: List[EntryDefinition], max_results: int, filters: List[str]
+) -> List[List[str]]:
+    """Run every entry's PubMed search concurrently (under the client's rate limit)."""
+    return await asyncio.gather(
+        *(pubmed.search_async(entry.search_query, max_results, filters) for entry in entries)
+    )
+
+
+def _dedupe_papers(papers: List[PubMedArticle]) -> List[PubMedArticle]:
+    """
+    Drop repeated papers so each abstract is extracted (and paid for) once.
+
+    A paper repeats an earlier one if it has the same PMID or, e.g. for a
+    reposted article, the same abstract up to case and whitespace.
+
+    Args:
+        papers: Fetched papers, in order
+
+    Returns:
+        First occurrence of each paper, order preserved
+    """
+    seen_pmids = set()
+    seen_abstracts = set()
+    unique = []
+    for paper in papers:
+        text = " ".join(paper.abstract.split()).casefold() if paper.abstract else None
+        if paper.pmid in seen_pmids or (text and text in seen_abstracts):
+            continue
+        seen_pmids.add(paper.pmid)
+        if text:
+            seen_abstracts.add(text)
+        unique.append(paper)
+    return unique
+
+
+def _save_abstracts(records: List[dict], abstracts_file: Path, parquet: bool) -> None:
+    """
+    Write the abstracts CSV (and optionally a Parquet copy) from the records.
+
+    Args:
+        records: abstracts_index rows
+        abstracts_file: CSV path; the Parquet copy gets the same stem
+        parquet: Also save zstd Parquet
+    """
+    # Written straight from the records (same CSV as DataFrame.to_csv, without
+    # building a DataFrame just to serialize it)
+    with open(abstracts_file, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=ABSTRACT_FIELDS, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(records)
+    logger.info(f"Saved {len(records)} abstracts to {abstracts_file}")
+
+    if parquet:
+        # Columnar copy for downstream queries (e.g. DuckDB)
+        parquet_file = abstracts_file.with_suffix(".parquet")
+        save_records_parquet(records, parquet_file)
+        logger.info(f"Saved {parquet_file}")
+
+
+def _load_checkpoint(path: Path) -> Dict[str, dict]:
+    """
+    Read the successful extractions left by a previous (possibly crashed) run.
+
+    Args:
+        path: Extractions JSONL file
+
+    Returns:
+        Successful records keyed by PMID (empty if the file does not exist)
+    """
+    done = {}
+    if not path.exists():
+        return done
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                record = loads_json(line)
+            except ValueError:
+                continue  # line cut short by the crash
+            if record.get("success"):
+                done[record["pmid"]] = record
+    return done
+
 
 def main():
     import argparse
@@ -53,10 +217,72 @@ def main():
     )
     parser.add_argument("--ncbi-api-key", default=os.getenv("NCBI_API_KEY"))
     parser.add_argument("--gemini-api-key", default=os.getenv("GEMINI_API_KEY"))
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="Max simultaneous Gemini requests"
+    )
+    parser.add_argument(
+        "--rpm", type=int, default=None, help="Gemini requests-per-minute quota (default: none)"
+    )
+    parser.add_argument(
+        "--tpm", type=int, default=None, help="Gemini tokens-per-minute quota (default: none)"
+    )
+    parser.add_argument(
+        "--cache-dir", default=DEFAULT_CACHE_DIR, help="Directory for cached extractions"
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="cache_dir",
+        action="store_const",
+        const=None,
+        help="Do not read or write the extraction cache",
+    )
+    parser.add_argument(
+        "--refresh-cache",
+        action="store_true",
+        help="Re-extract every abstract and overwrite cached results",
+    )
+    parser.add_argument(
+        "--parquet",
+        action="store_true",
+        help="Also save the abstracts as zstd Parquet (requires pyarrow)",
+    )
+    parser.add_argument(
+        "--fallback-model",
+        default="gemini-2.5-flash",
+        help="Model retried for abstracts flash-lite fails to extract",
+    )
+    parser.add_argument(
+        "--no-fallback",
+        dest="fallback_model",
+        action="store_const",
+        const=None,
+        help="Only use gemini-2.5-flash-lite",
+    )
+
+    parser.add_argument(
+        "--max-tokens",
+        type=int,
+        default=200_000,
+        help="Abort before extracting if the projected token usage exceeds this (0 = no limit)",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore extractions saved by a previous run instead of resuming from them",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Search PubMed and write every output, but use canned extractions "
+        "instead of calling Gemini (outputs get a .dry_run suffix)",
+    )
+    parser.add_argument("--quiet", action="store_true", help="Only log warnings and errors")
 
     args = parser.parse_args()
+    if args.quiet:
+        logger.setLevel(logging.WARNING)
 
-    if not args.gemini_api_key:
+    if not args.gemini_api_key and not args.dry_run:
         logger.error("GEMINI_API_KEY not set. Export GEMINI_API_KEY=your_key")
         return 1
 
@@ -91,33 +317,28 @@ def main():
     logger.info("\nStep 2: Searching PubMed...")
     pubmed = PubMedClient(email=args.email, api_key=args.ncbi_api_key)
 
-    all_papers = []
     papers_per_entry = max(1, args.limit // len(sleep_entries))
-
-    for entry in sleep_entries[:3]:  # Use first 3 entries to get variety
-        logger.info(f"  Searching: {entry.id} - {entry.search_query}")
-
-        filters = [
-            "randomized controlled trial[pt]",
-            "humans[MeSH Terms]",
-            "english[Language]",
-        ]
-
-        papers = pubmed.search_and_fetch(
-            query=entry.search_query,
-            max_results=papers_per_entry,
-            filters=filters,
-        )
-
-        logger.info(f"    Found {len(papers)} papers")
-        all_papers.extend(papers)
-
-        if len(all_papers) >= args.limit:
-            break
-
-        time.sleep(0.5)  # Be nice to NCBI
-
-    all_papers = all_papers[: args.limit]
+    filters = [
+        "randomized controlled trial[pt]",
+        "humans[MeSH Terms]",
+        "english[Language]",
+    ]
+
+    # Collect PMIDs from every search first, then fetch them all in one batched
+    # efetch (up to 200 IDs per request) instead of one fetch per entry.
+    # PMIDs returned by several searches are kept (and extracted) once
+    search_entries = sleep_entries[:3]  # Use first 3 entries to get variety
+    pmid_lists = asyncio.run(_search_all(pubmed, search_entries, papers_per_entry, filters))
+
+    pmids = {}  # insertion-ordered set
+    for entry, found in zip(search_entries, pmid_lists):
+        logger.info(f"  {entry.id} - {entry.search_query}: {len(found)} PMIDs")
+        pmids.update(dict.fromkeys(found))
+
+    fetched = pubmed.fetch_details(list(pmids)[: args.limit])
+    all_papers = _dedupe_papers(fetched)
+    if len(all_papers) < len(fetched):
+        logger.info(f"Deduped {len(fetched)} -> {len(all_papers)} papers (repeated abstracts)")
     logger.info(f"\nTotal papers collected: {len(all_papers)}")
 
     if not all_papers:
@@ -129,26 +350,30 @@ def main():
     # ========================================================================
     logger.info("\nStep 3: Saving abstracts...")
 
-    abstracts_index = []
-    for paper in all_papers:
-        abstracts_index.append(
-            {
-                "study_id": f"{paper.authors[0].split()[0] if paper.authors else 'Unknown'}{paper.year}",
-                "pmid": paper.pmid,
-                "doi": paper.doi or f"PMID:{paper.pmid}",
-                "year": paper.year,
-                "journal": paper.journal,
-                "title": paper.title,
-                "abstract": paper.abstract,
-                "authors": "; ".join(paper.authors[:5]),
-                "pmc_id": paper.pmc_id,
-            }
-        )
+    # One comprehension (no per-row .append lookup); join bound once
+    join_authors = "; ".join
+    abstracts_index = [
+        {
+            "study_id": f"{paper.authors[0].split()[0] if paper.authors else 'Unknown'}{paper.year}",
+            "pmid": paper.pmid,
+            "doi": paper.doi or f"PMID:{paper.pmid}",
+            "year": paper.year,
+            "journal": paper.journal,
+            "title": paper.title,
+            "abstract": paper.abstract,
+            "authors": join_authors(paper.authors[:5]),
+            "pmc_id": paper.pmc_id,
+        }
+        for paper in all_papers
+    ]
 
-    abstracts_df = pd.DataFrame(abstracts_index)
+    # Disk writes run on a background thread, overlapping the first Gemini
+    # requests; Step 5 waits for them before reporting
     abstracts_file = Path(args.abstracts_out) / "abstracts_sample_30.csv"
-    abstracts_df.to_csv(abstracts_file, index=False)
-    logger.info(f"Saved {len(abstracts_df)} abstracts to {abstracts_file}")
+    io_executor = ThreadPoolExecutor(max_workers=1)
+    abstracts_saved = io_executor.submit(
+        _save_abstracts, abstracts_index, abstracts_file, args.parquet
+    )
 
     # ========================================================================
     # STEP 4: Extract with Gemini
@@ -156,67 +381,123 @@ def main():
     logger.info("\nStep 4: Extracting with Gemini 2.5 Flash Lite...")
     logger.info("⚠️  This will use Gemini API tokens")
 
-    gemini = GeminiExtractor(
-        api_key=args.gemini_api_key,
-        model="gemini-2.5-flash-lite",
-        temperature=0.0,
-    )
+    if args.dry_run:
+        logger.info("Dry run: no Gemini API calls; extractions are placeholders")
+        gemini = DryRunExtractor()
+    else:
+        gemini = GeminiExtractor(
+            api_key=args.gemini_api_key,
+            model="gemini-2.5-flash-lite",
+            temperature=0.0,
+            rpm=args.rpm,
+            tpm=args.tpm,
+            cache_dir=args.cache_dir,
+            refresh_cache=args.refresh_cache,
+            fallback_model=args.fallback_model,
+        )
 
-    extractions = []
     success_count = 0
     error_count = 0
     total_tokens = 0
-
-    for i, row in abstracts_df.iterrows():
-        logger.info(f"\n[{i+1}/{len(abstracts_df)}] Extracting: {row['study_id']}")
-
-        result = gemini.extract_from_abstract(
-            abstract=row["abstract"],
-            study_id=row["study_id"],
-            doi=row["doi"],
-            year=row["year"],
-            journal=row["journal"],
+    first_success = None  # shown in the final printout
+    model_used = Counter()  # successful extractions per model
+
+    # Resume: successful records from an earlier run are kept and their rows
+    # skipped (keyed by PMID, since study_ids like "Smith2020" can collide);
+    # failed rows are extracted again
+    # Dry runs use their own files and always start over, so they never mix
+    # placeholders into a real checkpoint
+    suffix = ".dry_run" if args.dry_run else ""
+    extractions_file = Path(args.output) / f"extractions_sample_30{suffix}.jsonl"
+    done = {} if args.restart or args.dry_run else _load_checkpoint(extractions_file)
+    resumed = [done[row["pmid"]] for row in abstracts_index if row["pmid"] in done]
+    pending = [row for row in abstracts_index if row["pmid"] not in done]
+
+    for record in resumed:
+        success_count += 1
+        total_tokens += record.get("tokens_used") or 0
+        if first_success is None:
+            first_success = record
+        model_used[record["model"]] += 1
+
+    # Rewrite the checkpoint with just the kept records (atomically, so a
+    # crash here cannot lose them), then append new results to it
+    tmp_file = extractions_file.with_suffix(".jsonl.tmp")
+    with open(tmp_file, "wb") as f:
+        for record in resumed:
+            f.write(dumps_json_line(record))
+    os.replace(tmp_file, extractions_file)
+    if resumed:
+        logger.info(f"Resuming: {len(resumed)} extractions already in {extractions_file}")
+
+    # Requests overlap (bounded by --concurrency); results come back in row order
+    items = [
+        {
+            "abstract": record["abstract"],
+            "study_id": record["study_id"],
+            "doi": record["doi"],
+            "year": record["year"],
+            "journal": record["journal"],
+        }
+        for record in pending
+    ]
+    projected = sum(gemini.estimate_tokens(**item) for item in items)
+    budget = f"{args.max_tokens:,}" if args.max_tokens else "none"
+    logger.info(f"Projected token usage: ~{projected:,} (budget: {budget})")
+    if args.max_tokens and projected > args.max_tokens:
+        logger.error(
+            f"Projected {projected:,} tokens exceeds --max-tokens {args.max_tokens:,}; "
+            "lower --limit or raise the budget"
         )
+        return 2
+
+    logger.info(f"Extracting {len(items)} abstracts ({args.concurrency} concurrent requests)")
+    results = gemini.extract_stream(items, concurrency=args.concurrency)
+
+    # Each record is appended to the JSONL (one JSON object per line) as soon
+    # as it arrives, so memory stays flat and a crash keeps finished results
+    with open(extractions_file, "ab", buffering=0) as f:
+        for i, (row, result) in enumerate(zip(pending, results), 1):
+            # Lazy %-formatting: nothing is built when the level filters these out
+            logger.info("\n[%d/%d] %s", i, len(pending), row["study_id"])
+
+            extraction_record = {
+                "study_id": row["study_id"],
+                "pmid": row["pmid"],
+                "doi": row["doi"],
+                "success": result.success,
+                "model": result.model,
+                "temperature": result.temperature,
+                "timestamp": result.timestamp,
+                "tokens_used": result.tokens_used,
+            }
 
-        extraction_record = {
-            "study_id": row["study_id"],
-            "pmid": row["pmid"],
-            "doi": row["doi"],
-            "success": result.success,
-            "model": result.model,
-            "temperature": result.temperature,
-            "timestamp": result.timestamp,
-            "tokens_used": result.tokens_used,
-        }
+            if result.success:
+                extraction_record["data"] = result.data
+                success_count += 1
+                if result.tokens_used:
+                    total_tokens += result.tokens_used
+                if first_success is None:
+                    first_success = extraction_record
+                model_used[result.model] += 1
+                logger.info("  ✓ Success (%s, tokens: %s)", result.model, result.tokens_used)
+            else:
+                extraction_record["error"] = result.error
+                error_count += 1
+                logger.error("  ✗ Failed: %s", result.error)
 
-        if result.success:
-            extraction_record["data"] = result.data
-            success_count += 1
-            if result.tokens_used:
-                total_tokens += result.tokens_used
-            logger.info(f"  ✓ Success (tokens: {result.tokens_used})")
-        else:
-            extraction_record["error"] = result.error
-            error_count += 1
-            logger.error(f"  ✗ Failed: {result.error}")
+            f.write(dumps_json_line(extraction_record))
 
-        extractions.append(extraction_record)
+    n_extractions = success_count + error_count
+    logger.info(f"Saved {n_extractions} extractions to {extractions_file}")
 
-        # Rate limiting (Gemini has generous limits, but be cautious)
-        time.sleep(0.5)
+    abstracts_saved.result()  # re-raises a failed write
+    io_executor.shutdown()
 
     # ========================================================================
-    # STEP 5: Save results
+    # STEP 5: Save summary
     # ========================================================================
-    logger.info("\nStep 5: Saving extraction results...")
-
-    # Save as JSONL (one JSON object per line)
-    extractions_file = Path(args.output) / "extractions_sample_30.jsonl"
-    with open(extractions_file, "w") as f:
-        for extraction in extractions:
-            f.write(json.dumps(extraction) + "\n")
-
-    logger.info(f"Saved {len(extractions)} extractions to {extractions_file}")
+    logger.info("\nStep 5: Saving extraction summary...")
 
     # Save summary
     summary = {
@@ -224,13 +505,15 @@ def main():
             "date": datetime.utcnow().isoformat() + "Z",
             "model": "gemini-2.5-flash-lite",
             "temperature": 0.0,
-            "total_samples": len(extractions),
+            "total_samples": n_extractions,
             "target_limit": args.limit,
+            "dry_run": args.dry_run,
         },
         "results": {
             "success": success_count,
             "errors": error_count,
-            "success_rate": success_count / len(extractions) if extractions else 0,
+            "success_rate": success_count / n_extractions if n_extractions else 0,
+            "model_used": dict(model_used),
         },
         "token_usage": {
             "total_tokens": total_tokens,
@@ -242,7 +525,7 @@ def main():
         "abstracts_file": str(abstracts_file),
     }
 
-    summary_file = Path(args.output) / "extraction_summary_30.json"
+    summary_file = Path(args.output) / f"extraction_summary_30{suffix}.json"
     save_json(summary, summary_file)
 
     # ========================================================================
@@ -251,9 +534,11 @@ def main():
     logger.info("\n" + "=" * 60)
     logger.info("EXTRACTION TEST COMPLETE")
     logger.info("=" * 60)
-    logger.info(f"Total samples: {len(extractions)}")
-    logger.info(f"Successful: {success_count} ({success_count/len(extractions)*100:.1f}%)")
+    logger.info(f"Total samples: {n_extractions}")
+    logger.info(f"Successful: {success_count} ({success_count/n_extractions*100:.1f}%)")
     logger.info(f"Errors: {error_count}")
+    for model_name, count in model_used.items():
+        logger.info(f"  {model_name}: {count} extractions")
     logger.info(f"Total tokens used: {total_tokens:,}")
     logger.info(
         f"Avg tokens/extraction: {total_tokens/success_count if success_count > 0 else 0:.0f}"
@@ -269,7 +554,7 @@ def main():
         logger.info("SAMPLE EXTRACTION (first successful):")
         logger.info("=" * 60)
 
-        sample = next((e for e in extractions if e["success"]), None)
+        sample = first_success
         if sample and "data" in sample:
             logger.info(f"\nStudy: {sample['study_id']}")
             logger.info(f"Outcome: {sample['data']['outcome_context']['measure_name']}")
@@ -4,7 +4,7 @@ Test Gemini extraction with sample abstracts (no PubMed needed).
 """
 
 import sys
-import json
+import asyncio
 from pathlib import Path
 from datetime import datetime
 
@@ -15,7 +15,7 @@ load_dotenv()
 
 from src.extraction.gemini_client import GeminiExtractor
 from src.common.logging import setup_logger
-from src.common.io_utils import save_json, ensure_dir
+from src.common.io_utils import dumps_json_line, save_json, ensure_dir
 import pandas as pd
 
 logger = setup_logger("gemini_test", level="INFO")
@@ -83,17 +83,14 @@ def main():
     success_count = 0
     total_tokens = 0
 
-    for i, sample in enumerate(SAMPLE_ABSTRACTS, 1):
-        logger.info(f"\n[{i}/{len(SAMPLE_ABSTRACTS)}] Extracting: {sample['study_id']}")
-        logger.info(f"  DOI: {sample['doi']}")
+    # All samples are extracted concurrently; results come back in sample order
+    fields = ("abstract", "study_id", "doi", "year", "journal")
+    items = [{k: sample[k] for k in fields} for sample in SAMPLE_ABSTRACTS]
+    results = asyncio.run(gemini.extract_batch(items))
 
-        result = gemini.extract_from_abstract(
-            abstract=sample["abstract"],
-            study_id=sample["study_id"],
-            doi=sample["doi"],
-            year=sample["year"],
-            journal=sample["journal"],
-        )
+    for i, (sample, result) in enumerate(zip(SAMPLE_ABSTRACTS, results), 1):
+        logger.info(f"\n[{i}/{len(SAMPLE_ABSTRACTS)}] {sample['study_id']}")
+        logger.info(f"  DOI: {sample['doi']}")
 
         extraction_record = {
             "study_id": sample["study_id"],
@@ -126,9 +123,9 @@ def main():
 
     # Save JSONL
     jsonl_file = output_dir / "test_extractions.jsonl"
-    with open(jsonl_file, "w") as f:
+    with open(jsonl_file, "wb") as f:
         for extraction in extractions:
-            f.write(json.dumps(extraction) + "\n")
+            f.write(dumps_json_line(extraction))
     logger.info(f"✓ Saved JSONL: {jsonl_file}")
 
     # Save summary